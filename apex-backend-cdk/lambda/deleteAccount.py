@@ -3,20 +3,38 @@ Lambda function to delete a user account entirely.
 
 1. Queries DynamoDB byUser GSI for ALL items belonging to the user
 2. Also queries main table PK = USER#<userId> for profile data
-3. Batch deletes all items from DynamoDB
-4. Deletes the Cognito user via AdminDeleteUser
+3. Batch deletes all items from DynamoDB while the queries are still paging
+4. Deletes the Cognito user via AdminDeleteUser, alongside the DynamoDB deletes
 5. Returns success
 
 Environment variables:
     TABLE_NAME   - DynamoDB table name
     USER_POOL_ID - Cognito User Pool ID
+    DDB_WRITE_PARALLELISM        - max concurrent BatchWriteItem calls (default 8)
+    DDB_WRITE_BATCHES_PER_SECOND - BatchWriteItem rate limit (default 0 = off)
 """
 
 import os
 import json
-import boto3
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-dynamodb = boto3.resource("dynamodb")
+import boto3
+from botocore.config import Config
+
+# Keep pooled connections alive across warm invocations to skip repeat TLS handshakes
+_ddb_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=32,
+    retries={"mode": "adaptive", "max_attempts": 10},
+)
+dynamodb = boto3.resource("dynamodb", config=_ddb_config)
+# Low-level client for BatchWriteItem so UnprocessedItems are visible to us
+ddb_client = boto3.client("dynamodb", config=_ddb_config)
 cognito = boto3.client("cognito-idp")
 
 TABLE_NAME = os.environ["TABLE_NAME"]
@@ -24,10 +42,63 @@ USER_POOL_ID = os.environ["USER_POOL_ID"]
 
 table = dynamodb.Table(TABLE_NAME)
 
-
-def query_all_user_items(user_id: str) -> list[dict]:
-    """Query all items from the byUser GSI for a given userId (handles pagination)."""
-    items = []
+# DynamoDB BatchWriteItem supports max 25 items per batch
+BATCH_SIZE = 25
+# Concurrent BatchWriteItem calls; chunks are independent once keys are deduplicated
+DELETE_WORKERS = 8
+# Retries of a chunk's UnprocessedItems before the deletion is failed
+MAX_UNPROCESSED_RETRIES = 8
+
+# Caps in-flight BatchWriteItem calls and their rate so parallel deletes stay under
+# the table's write capacity instead of turning into throttles
+WRITE_PARALLELISM = int(os.environ.get("DDB_WRITE_PARALLELISM", 8))
+WRITE_BATCHES_PER_SECOND = float(os.environ.get("DDB_WRITE_BATCHES_PER_SECOND", 0))
+
+# Marks the end of one query's pages on the delete queue
+_QUERY_DONE = object()
+
+
+class TokenBucket:
+    """Thread-safe token bucket; a rate of 0 disables limiting."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        # At least one token of capacity, or a rate below 1/s could never fill a token
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> None:
+        if self.rate <= 0:
+            return
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+
+_write_sem = threading.Semaphore(WRITE_PARALLELISM)
+_write_bucket = TokenBucket(WRITE_BATCHES_PER_SECOND)
+
+
+@contextmanager
+def write_slot():
+    """Hold one of the WRITE_PARALLELISM slots for a single BatchWriteItem call."""
+    _write_bucket.take()
+    with _write_sem:
+        yield
+
+
+def query_all_user_items(user_id: str) -> Iterator[list[dict]]:
+    """Yield pages of items from the byUser GSI for a given userId (handles pagination)."""
     params = {
         "IndexName": "byUser",
         "KeyConditionExpression": "byUserPK = :pk",
@@ -37,18 +108,15 @@ def query_all_user_items(user_id: str) -> list[dict]:
 
     while True:
         response = table.query(**params)
-        items.extend(response.get("Items", []))
+        yield response.get("Items", [])
         last_key = response.get("LastEvaluatedKey")
         if not last_key:
             break
         params["ExclusiveStartKey"] = last_key
 
-    return items
-
 
-def query_main_table_user_items(user_id: str) -> list[dict]:
-    """Query items from the main table where PK = USER#<userId> (profile, etc.)."""
-    items = []
+def query_main_table_user_items(user_id: str) -> Iterator[list[dict]]:
+    """Yield pages of items from the main table where PK = USER#<userId> (profile, etc.)."""
     params = {
         "KeyConditionExpression": "PK = :pk",
         "ExpressionAttributeValues": {":pk": f"USER#{user_id}"},
@@ -57,42 +125,103 @@ def query_main_table_user_items(user_id: str) -> list[dict]:
 
     while True:
         response = table.query(**params)
-        items.extend(response.get("Items", []))
+        yield response.get("Items", [])
         last_key = response.get("LastEvaluatedKey")
         if not last_key:
             break
         params["ExclusiveStartKey"] = last_key
 
-    return items
 
+def enqueue_pages(pages: Iterator[list[dict]], sink: queue.Queue) -> None:
+    """Push every page onto the delete queue, then mark this query as done."""
+    try:
+        for page in pages:
+            sink.put(page)
+    finally:
+        sink.put(_QUERY_DONE)
+
+
+def batch_delete_items(keys: list[tuple[str, str]]) -> int:
+    """Batch delete a single chunk of up to 25 unique (PK, SK) keys from DynamoDB."""
+    request = {
+        TABLE_NAME: [
+            {"DeleteRequest": {"Key": {"PK": {"S": pk}, "SK": {"S": sk}}}}
+            for pk, sk in keys
+        ]
+    }
 
-def batch_delete_items(items: list[dict]) -> None:
-    """Batch delete items from DynamoDB (handles batches of 25, deduplicates)."""
-    # Deduplicate by PK+SK
-    unique_keys: dict[str, dict] = {}
-    for item in items:
-        key = f"{item['PK']}||{item['SK']}"
-        if key not in unique_keys:
-            unique_keys[key] = {"PK": item["PK"], "SK": item["SK"]}
-
-    all_keys = list(unique_keys.values())
-    print(f"Deleting {len(all_keys)} items from DynamoDB")
+    attempt = 0
+    while True:
+        with write_slot():
+            response = ddb_client.batch_write_item(RequestItems=request)
+        request = response.get("UnprocessedItems") or {}
+        if not request:
+            break
 
-    # DynamoDB BatchWriteItem supports max 25 items per batch
-    for i in range(0, len(all_keys), 25):
-        batch = all_keys[i : i + 25]
-        with table.batch_writer() as writer:
-            for key in batch:
-                writer.delete_item(Key={"PK": key["PK"], "SK": key["SK"]})
-        print(f"Deleted batch {i // 25 + 1}: {len(batch)} items")
+        # Throttled: back off exponentially and resend only what was left over
+        attempt += 1
+        unprocessed = len(request.get(TABLE_NAME, []))
+        if attempt > MAX_UNPROCESSED_RETRIES:
+            raise RuntimeError(
+                f"{unprocessed} items still unprocessed after {MAX_UNPROCESSED_RETRIES} retries"
+            )
+        print(f"Retrying {unprocessed} unprocessed deletes (attempt {attempt})")
+        time.sleep(min(2**attempt * 0.05, 5))
+
+    print(f"Deleted batch: {len(keys)} items")
+    return len(keys)
+
+
+def delete_streamed_items(sink: queue.Queue, query_count: int) -> int:
+    """
+    Consume query pages as they arrive and dispatch deletes in chunks of 25 to a
+    pool of DELETE_WORKERS, so BatchWriteItem calls overlap with each other and
+    with the remaining Query pages.
+    Returns the number of unique items deleted.
+    """
+    # Deduplicate by PK+SK (an item can be returned by both queries)
+    seen: set[tuple[str, str]] = set()
+    pending: list[tuple[str, str]] = []
+    futures = []
+    finished = 0
+
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+        while finished < query_count:
+            page = sink.get()
+            if page is _QUERY_DONE:
+                finished += 1
+                continue
+
+            for item in page:
+                key = (item["PK"], item["SK"])
+                if key not in seen:
+                    seen.add(key)
+                    pending.append(key)
+
+            while len(pending) >= BATCH_SIZE:
+                futures.append(
+                    executor.submit(batch_delete_items, pending[:BATCH_SIZE])
+                )
+                pending = pending[BATCH_SIZE:]
+
+        if pending:
+            futures.append(executor.submit(batch_delete_items, pending))
+
+        deleted = sum(future.result() for future in futures)
+
+    return deleted
 
 
 def delete_cognito_user(username: str) -> None:
-    """Delete the user from Cognito."""
-    cognito.admin_delete_user(
-        UserPoolId=USER_POOL_ID,
-        Username=username,
-    )
+    """Delete the user from Cognito; a user already gone from a prior attempt is fine."""
+    try:
+        cognito.admin_delete_user(
+            UserPoolId=USER_POOL_ID,
+            Username=username,
+        )
+    except cognito.exceptions.UserNotFoundException:
+        print(f"Cognito user already deleted: {username}")
+        return
     print(f"Deleted Cognito user: {username}")
 
 
@@ -111,23 +240,23 @@ def handler(event, context):
     print(f"Starting account deletion for userId: {user_id}")
 
     try:
-        # Step 1: Find all user items via byUser GSI
-        gsi_items = query_all_user_items(user_id)
-        print(f"Found {len(gsi_items)} items via byUser GSI")
-
-        # Step 2: Find items in main table under USER#<userId>
-        main_items = query_main_table_user_items(user_id)
-        print(f"Found {len(main_items)} items in main table")
-
-        # Step 3: Combine all items
-        all_items = gsi_items + main_items
-
-        # Step 4: Batch delete all items from DynamoDB
-        if all_items:
-            batch_delete_items(all_items)
-
-        # Step 5: Delete the user from Cognito
-        delete_cognito_user(cognito_username)
+        # Steps 1-4: Query the byUser GSI and the main table USER#<userId> partition
+        # concurrently, batch deleting items while the queries are still paging.
+        # The Cognito delete is independent of the table, so it runs alongside.
+        sink: queue.Queue = queue.Queue()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            cognito_future = executor.submit(delete_cognito_user, cognito_username)
+            queries = [
+                executor.submit(enqueue_pages, query_all_user_items(user_id), sink),
+                executor.submit(
+                    enqueue_pages, query_main_table_user_items(user_id), sink
+                ),
+            ]
+            deleted = delete_streamed_items(sink, len(queries))
+            for future in queries:
+                future.result()
+            print(f"Deleted {deleted} items from DynamoDB")
+            cognito_future.result()
 
         print(f"Account deletion complete for userId: {user_id}")
         return True
@@ -0,0 +1,32 @@
+import boto3
+from botocore.config import Config
+
+# Shared DynamoDB resource for the service Lambdas.
+# tcp_keepalive keeps pooled connections open between warm invocations so calls
+# don't pay a fresh TLS handshake; the pool is sized for the thread fan-outs.
+_cfg = Config(
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    retries={"mode": "adaptive", "max_attempts": 10},
+)
+dynamodb = boto3.resource("dynamodb", config=_cfg)
+
+# Plain low-level client for hot paths that pass wire-format values ({"N": "10"})
+# and skip boto3's TypeSerializer. dynamodb.meta.client would still serialize them.
+client = boto3.client("dynamodb", config=_cfg)
+
+# Optional asyncio client for fan-outs of many small calls. aioboto3 is only
+# present when the Lambda is packaged with it; callers fall back to threads
+# when aio_session is None.
+try:
+    import aioboto3
+    from aiobotocore.config import AioConfig
+except ImportError:
+    aio_session = None
+    aio_config = None
+else:
+    aio_session = aioboto3.Session()
+    aio_config = AioConfig(
+        max_pool_connections=64,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    )
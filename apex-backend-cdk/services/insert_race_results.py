@@ -1,14 +1,17 @@
 import json
-import boto3
 import os
 from datetime import datetime
 import dotenv
 
-# Initialize DynamoDB resource
+# Initialize DynamoDB resource (after .env so region/credentials are picked up)
 dotenv.load_dotenv()
-dynamodb = boto3.resource("dynamodb")
+from _ddb import dynamodb
+
 TABLE_NAME = os.environ.get("TABLE_NAME")
 
+# Reused across warm invocations; handler raises if TABLE_NAME is missing
+table = dynamodb.Table(TABLE_NAME) if TABLE_NAME else None
+
 
 def handler(event, context):
     """
@@ -41,8 +44,6 @@ def handler(event, context):
     if not TABLE_NAME:
         raise ValueError("TABLE_NAME environment variable is not set")
 
-    table = dynamodb.Table(TABLE_NAME)
-
     # Format keys according to project convention
     # PK: {category}#{season}
     # SK: RESULTS#{race_id}
@@ -1,110 +1,146 @@
+import asyncio
 import json
-import boto3
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
 from boto3.dynamodb.conditions import Key
 
-# Initialize DynamoDB resource
-dynamodb = boto3.resource("dynamodb")
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Shared DynamoDB resource and client; the connection pool is sized above MAX_WORKERS
+from _ddb import aio_config, aio_session, client, dynamodb
+
 TABLE_NAME = os.environ.get("TABLE_NAME")
 
+# Reused across warm invocations; handler raises if TABLE_NAME is missing
+table = dynamodb.Table(TABLE_NAME) if TABLE_NAME else None
+
+MAX_WORKERS = 32
+# In-flight leaderboard updates when running on the aioboto3 event loop
+ASYNC_CONCURRENCY = 64
+USER_SK_PREFIX = "USER#"
+ADDITIONAL_KEYS = ("pole", "fastestLap", "positionsGained")
+
+
+# Padded sort keys for the common range of race and season totals
+_PADDED_POINTS = [f"{1000000 - i:07d}" for i in range(2001)]
+
 
 def get_padded_points(points):
     """
     Calculate padded points for GSI sorting: 1000000 - points, padded to 7 digits.
     This allows ascending sort on the SK to give descending points.
     """
-    score = 1000000 - int(points)
-    return str(score).zfill(7)
+    points = int(points)
+    if 0 <= points < len(_PADDED_POINTS):
+        return _PADDED_POINTS[points]
+    return str(1000000 - points).zfill(7)
 
 
-def calculate_driver_points(predictions, race_results, has_sprint=False):
+def position_points(diff):
+    """Grid/sprint position points: correct=10, miss by 1=5, miss by 2=2."""
+    if diff == 0:
+        return 10
+    if diff == 1:
+        return 5
+    if diff == 2:
+        return 2
+    return 0
+
+
+def build_result_index(race_results, has_sprint=False):
     """
-    Replicates the logic from mobile_app/src/utils/pointsCalculator.ts
+    Derive the race-result lookups shared by every prediction of a race.
+    Built once per invocation and passed to the calculate_* functions.
     """
-    driver_points_map = {}
-
-    all_driver_numbers = set()
-    for item in race_results.get("gridOrder", []):
-        all_driver_numbers.add(item["driverNumber"])
+    # driverNumber -> actual position, so each prediction is a dict lookup.
+    # Built in reverse so a repeated driver keeps its first position.
+    actual_grid = {
+        r["driverNumber"]: r["position"]
+        for r in reversed(race_results.get("gridOrder", []))
+    }
+    actual_sprint = (
+        {
+            r["driverNumber"]: r["position"]
+            for r in reversed(race_results.get("sprintPositions", []))
+        }
+        if has_sprint
+        else {}
+    )
+    return {
+        "has_sprint": has_sprint,
+        "actual_grid": actual_grid,
+        "actual_sprint": actual_sprint,
+        "add_actual": race_results.get("additionalPredictions", {}),
+    }
 
-    if has_sprint and race_results.get("sprintPositions"):
-        for item in race_results.get("sprintPositions", []):
-            all_driver_numbers.add(item["driverNumber"])
 
-    for pred in predictions.get("gridOrder", []):
-        if pred.get("driverNumber"):
-            all_driver_numbers.add(pred["driverNumber"])
+def calculate_driver_points(predictions, result_index):
+    """
+    Replicates the logic from mobile_app/src/utils/pointsCalculator.ts
+    """
+    actual_grid = result_index["actual_grid"]
+    actual_sprint = result_index["actual_sprint"]
 
-    if has_sprint and predictions.get("sprintPositions"):
-        for pred in predictions.get("sprintPositions", []):
-            if pred.get("driverNumber"):
-                all_driver_numbers.add(pred["driverNumber"])
+    pred_sprint = (
+        predictions.get("sprintPositions", []) if result_index["has_sprint"] else []
+    )
+    all_driver_numbers = (
+        set(actual_grid)
+        | set(actual_sprint)
+        | {
+            p["driverNumber"]
+            for p in predictions.get("gridOrder", [])
+            if p.get("driverNumber")
+        }
+        | {p["driverNumber"] for p in pred_sprint if p.get("driverNumber")}
+    )
 
-    for dn in all_driver_numbers:
-        driver_points_map[dn] = {"points": 0, "breakdown": {}}
+    driver_points_map = {
+        dn: {"points": 0, "breakdown": {}} for dn in all_driver_numbers
+    }
 
-    # Grid position points: correct=10, miss by 1=5, miss by 2=2
+    # Grid position points
     for pred in predictions.get("gridOrder", []):
         dn = pred.get("driverNumber")
         if dn is None:
             continue
 
-        actual = next(
-            (r for r in race_results.get("gridOrder", []) if r["driverNumber"] == dn),
-            None,
-        )
-        if actual:
-            diff = abs(actual["position"] - pred["position"])
-            pts = 0
-            if diff == 0:
-                pts = 10
-            elif diff == 1:
-                pts = 5
-            elif diff == 2:
-                pts = 2
-
+        actual_pos = actual_grid.get(dn)
+        if actual_pos is not None:
+            pts = position_points(abs(actual_pos - pred["position"]))
             driver_points_map[dn]["points"] += pts
             driver_points_map[dn]["breakdown"]["gridPosition"] = pts
 
     # Sprint points (same logic as grid position for F1)
-    if (
-        has_sprint
-        and race_results.get("sprintPositions")
-        and predictions.get("sprintPositions")
-    ):
-        for pred in predictions.get("sprintPositions", []):
+    if actual_sprint:
+        for pred in pred_sprint:
             dn = pred.get("driverNumber")
             if not dn:
                 continue
 
-            actual_sprint = next(
-                (
-                    r
-                    for r in race_results.get("sprintPositions", [])
-                    if r["driverNumber"] == dn
-                ),
-                None,
-            )
-            if actual_sprint:
-                diff = abs(actual_sprint["position"] - pred["position"])
-                pts = 0
-                if diff == 0:
-                    pts = 10
-                elif diff == 1:
-                    pts = 5
-                elif diff == 2:
-                    pts = 2
-
+            actual_pos = actual_sprint.get(dn)
+            if actual_pos is not None:
+                pts = position_points(abs(actual_pos - pred["position"]))
                 driver_points_map[dn]["points"] += pts
                 driver_points_map[dn]["breakdown"]["sprintPosition"] = pts
 
     # Additional predictions: pole, fastestLap, positionsGained (10 pts each)
-    add_actual = race_results.get("additionalPredictions", {})
+    add_actual = result_index["add_actual"]
     add_pred = predictions.get("additionalPredictions", {})
 
-    for key in ["pole", "fastestLap", "positionsGained"]:
+    for key in ADDITIONAL_KEYS:
         a_val = add_actual.get(key)
         p_val = add_pred.get(key)
         if a_val is not None and p_val is not None and a_val == p_val:
@@ -115,26 +151,20 @@ def calculate_driver_points(predictions, race_results, has_sprint=False):
     return driver_points_map
 
 
-def calculate_bonus_points(predictions, race_results):
+def calculate_bonus_points(predictions, result_index):
     """
     Replicates the logic from mobile_app/src/utils/pointsCalculator.ts
     """
+    # First prediction for each position wins, as in the app
+    pred_by_pos = {
+        p["position"]: p.get("driverNumber")
+        for p in reversed(predictions.get("gridOrder", []))
+    }
+    actual_by_dn = result_index["actual_grid"]
 
     def is_pos_correct(pos):
-        pred = next(
-            (p for p in predictions.get("gridOrder", []) if p["position"] == pos), None
-        )
-        if not pred or pred.get("driverNumber") is None:
-            return False
-        actual = next(
-            (
-                r
-                for r in race_results.get("gridOrder", [])
-                if r["driverNumber"] == pred["driverNumber"]
-            ),
-            None,
-        )
-        return actual and actual["position"] == pos
+        dn = pred_by_pos.get(pos)
+        return dn is not None and actual_by_dn.get(dn) == pos
 
     winner_earned = is_pos_correct(1)
     podium_earned = is_pos_correct(1) and is_pos_correct(2) and is_pos_correct(3)
@@ -157,6 +187,322 @@ def calculate_bonus_points(predictions, race_results):
     return total
 
 
+def calculate_additional_points(predictions, result_index):
+    """
+    Points for pole, fastestLap and positionsGained alone (10 pts each), with the
+    same driver check as calculate_driver_points. Used by calculate_scores_bulk.
+    """
+    add_actual = result_index["add_actual"]
+    add_pred = predictions.get("additionalPredictions", {})
+    matched = [
+        add_actual[key]
+        for key in ADDITIONAL_KEYS
+        if add_actual.get(key) is not None and add_actual[key] == add_pred.get(key)
+    ]
+    if not matched:
+        return 0
+
+    pred_sprint = (
+        predictions.get("sprintPositions", []) if result_index["has_sprint"] else []
+    )
+    known_drivers = (
+        set(result_index["actual_grid"])
+        | set(result_index["actual_sprint"])
+        | {
+            p["driverNumber"]
+            for p in predictions.get("gridOrder", [])
+            if p.get("driverNumber")
+        }
+        | {p["driverNumber"] for p in pred_sprint if p.get("driverNumber")}
+    )
+    return sum(10 for dn in matched if dn in known_drivers)
+
+
+def score_prediction(predictions, result_index):
+    """Total race points for one parsed prediction."""
+    driver_points = calculate_driver_points(predictions, result_index)
+    bonus_points = calculate_bonus_points(predictions, result_index)
+    return sum(d["points"] for d in driver_points.values()) + bonus_points
+
+
+def load_prediction(pred_item):
+    """The prediction payload of a RacePrediction item, parsed if stored as JSON."""
+    prediction = pred_item["prediction"]
+    return _json_loads(prediction) if isinstance(prediction, str) else prediction
+
+
+def _small_int(value):
+    """value as an int if it is a whole number that fits the int16 matrices, else None."""
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        if value == int(value) and -10000 < value < 10000:
+            return int(value)
+    return None
+
+
+def _fill_positions(entries, driver_idx, pos_row, set_row, scored):
+    """
+    Write one prediction's positions into its matrix row. Returns False when the
+    entries can't be represented as one position per driver (repeated drivers or
+    positions, non-integer positions), leaving that user to score_prediction.
+    """
+    seen_positions = set()
+    for entry in entries:
+        pos = _small_int(entry["position"])
+        if pos is None or pos in seen_positions:
+            return False
+        seen_positions.add(pos)
+
+        dn = entry.get("driverNumber")
+        if not scored(dn) or dn not in driver_idx:
+            continue
+        i = driver_idx[dn]
+        if set_row[i]:
+            return False
+        pos_row[i] = pos
+        set_row[i] = True
+    return True
+
+
+def _position_points_matrix(pred_pos, pred_set, actual_pos):
+    """Per-user sum of position_points over every predicted driver."""
+    diff = np.abs(pred_pos - actual_pos[None, :])
+    pts = np.select([diff == 0, diff == 1, diff == 2], [10, 5, 2], default=0)
+    return np.where(pred_set, pts, 0).sum(axis=1)
+
+
+def calculate_scores_bulk(preds, result_index):
+    """
+    Score many parsed predictions at once, one matrix row per user and one column
+    per driver in the race results. Returns each prediction's total race points,
+    or None where it must go through score_prediction instead (numpy missing, or a
+    prediction the matrices can't represent); the totals are identical either way.
+    """
+    totals = [None] * len(preds)
+    if np is None or not preds:
+        return totals
+
+    actual_grid = result_index["actual_grid"]
+    actual_sprint = result_index["actual_sprint"]
+    actual_grid_pos = [_small_int(pos) for pos in actual_grid.values()]
+    actual_sprint_pos = [_small_int(pos) for pos in actual_sprint.values()]
+    if None in actual_grid_pos or None in actual_sprint_pos:
+        return totals
+
+    grid_idx = {dn: i for i, dn in enumerate(actual_grid)}
+    sprint_idx = {dn: i for i, dn in enumerate(actual_sprint)}
+    grid_actual = np.array(actual_grid_pos, dtype=np.int16)
+    sprint_actual = np.array(actual_sprint_pos, dtype=np.int16)
+
+    n = len(preds)
+    grid_pos = np.zeros((n, len(grid_idx)), dtype=np.int16)
+    grid_set = np.zeros((n, len(grid_idx)), dtype=bool)
+    sprint_pos = np.zeros((n, len(sprint_idx)), dtype=np.int16)
+    sprint_set = np.zeros((n, len(sprint_idx)), dtype=bool)
+
+    # Rows that made it into the matrices, with their additionalPredictions points
+    rows = []
+    extra = []
+    for u, pred in enumerate(preds):
+        try:
+            if not _fill_positions(
+                pred.get("gridOrder", []),
+                grid_idx,
+                grid_pos[u],
+                grid_set[u],
+                lambda dn: dn is not None,
+            ):
+                continue
+            if actual_sprint and not _fill_positions(
+                pred.get("sprintPositions", []),
+                sprint_idx,
+                sprint_pos[u],
+                sprint_set[u],
+                bool,
+            ):
+                continue
+            extra.append(calculate_additional_points(pred, result_index))
+        except (AttributeError, KeyError, TypeError):
+            # Malformed prediction; score_prediction raises for it on the worker
+            continue
+        rows.append(u)
+
+    if not rows:
+        return totals
+
+    grid_pos, grid_set = grid_pos[rows], grid_set[rows]
+    points = _position_points_matrix(grid_pos, grid_set, grid_actual)
+    if actual_sprint:
+        points += _position_points_matrix(
+            sprint_pos[rows], sprint_set[rows], sprint_actual
+        )
+
+    # Bonuses: a position is correct when the driver predicted there finished there
+    hits = grid_set & (grid_pos == grid_actual[None, :])
+
+    def correct_at(pos):
+        return hits[:, grid_actual == pos].any(axis=1)
+
+    winner = correct_at(1)
+    podium = winner & correct_at(2) & correct_at(3)
+    correct_count = hits[:, (grid_actual >= 1) & (grid_actual <= 10)].sum(axis=1)
+    points += (
+        10 * winner
+        + 30 * podium
+        + 60 * (correct_count >= 6)
+        + 100 * (correct_count == 10)
+    )
+
+    for u, total, add_points in zip(rows, points.tolist(), extra):
+        totals[u] = total + add_points
+    return totals
+
+
+def score_item(pred_item, result_index, timestamp, total_race_points=None):
+    """
+    Score a single prediction. total_race_points comes from calculate_scores_bulk
+    when available; otherwise it is computed here. Returns the total and the
+    prediction item with its new points, or None in its place when the stored
+    values are already up to date.
+    """
+    # Calculate points for this race
+    if total_race_points is None:
+        total_race_points = score_prediction(load_prediction(pred_item), result_index)
+
+    # Scored RacePrediction, written later in one batch by handler.
+    # Predictions that already carry these values are skipped (None).
+    padded_race = get_padded_points(total_race_points)
+    new_by_leaderboard_sk = padded_race + "#USER#" + pred_item["userId"]
+
+    scored_item = None
+    if (
+        pred_item.get("points") != total_race_points
+        or pred_item.get("byLeaderboardSK") != new_by_leaderboard_sk
+    ):
+        scored_item = {
+            **pred_item,
+            "points": total_race_points,
+            "byLeaderboardSK": new_by_leaderboard_sk,
+            "updatedAt": timestamp,
+        }
+    return total_race_points, scored_item
+
+
+def leaderboard_key(lb_pk, user_id):
+    """
+    LeaderboardEntry key in wire format for the low-level client.
+    PK: LEADERBOARD#{category}#{season} (built once by handler)
+    SK: USER#{user_id}
+    """
+    return {"PK": {"S": lb_pk}, "SK": {"S": USER_SK_PREFIX + user_id}}
+
+
+def add_race_request(lb_pk, user_id, total_race_points, timestamp):
+    """
+    UpdateItem arguments that atomically add this race to the running total; the
+    condition keeps us from creating a partial entry when the user has no
+    leaderboard row. Values are sent pre-serialized through the low-level client.
+    """
+    return {
+        "TableName": TABLE_NAME,
+        "Key": leaderboard_key(lb_pk, user_id),
+        "UpdateExpression": "ADD totalPoints :p, numberOfRaces :one SET updatedAt = :u",
+        "ConditionExpression": "attribute_exists(PK)",
+        "ExpressionAttributeValues": {
+            ":p": {"N": str(total_race_points)},
+            ":one": {"N": "1"},
+            ":u": {"S": timestamp},
+        },
+        "ReturnValues": "UPDATED_NEW",
+    }
+
+
+def leaderboard_sk_request(lb_pk, user_id, lb_resp):
+    """UpdateItem arguments for the sort key, which depends on the new total."""
+    new_total = int(lb_resp["Attributes"]["totalPoints"]["N"])
+    new_lb_sk = get_padded_points(new_total) + "#USER#" + user_id
+    return {
+        "TableName": TABLE_NAME,
+        "Key": leaderboard_key(lb_pk, user_id),
+        "UpdateExpression": "SET byLeaderboardSK = :sk",
+        "ExpressionAttributeValues": {":sk": {"S": new_lb_sk}},
+    }
+
+
+def warn_missing_leaderboard(user_id, lb_pk):
+    # If for some reason the leaderboard entry doesn't exist, we skip or could create it
+    # In this project, initMyLeaderboards usually creates it
+    print(f"Warning: No leaderboard entry found for user {user_id} in {lb_pk}")
+
+
+def process_prediction(
+    pred_item, result_index, timestamp, lb_pk, total_race_points=None
+):
+    """
+    Score a single prediction and add it to the user's leaderboard entry.
+    Runs on a worker thread from handler. Returns the scored item from score_item.
+    """
+    user_id = pred_item["userId"]
+    total_race_points, scored_item = score_item(
+        pred_item, result_index, timestamp, total_race_points
+    )
+
+    try:
+        lb_resp = client.update_item(
+            **add_race_request(lb_pk, user_id, total_race_points, timestamp)
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        warn_missing_leaderboard(user_id, lb_pk)
+        return scored_item
+
+    client.update_item(**leaderboard_sk_request(lb_pk, user_id, lb_resp))
+    return scored_item
+
+
+async def process_prediction_async(
+    aclient, sem, pred_item, result_index, timestamp, lb_pk, total_race_points=None
+):
+    """process_prediction on the event loop, holding sem for its two UpdateItems."""
+    user_id = pred_item["userId"]
+    total_race_points, scored_item = score_item(
+        pred_item, result_index, timestamp, total_race_points
+    )
+
+    async with sem:
+        try:
+            lb_resp = await aclient.update_item(
+                **add_race_request(lb_pk, user_id, total_race_points, timestamp)
+            )
+        except aclient.exceptions.ConditionalCheckFailedException:
+            warn_missing_leaderboard(user_id, lb_pk)
+            return scored_item
+
+        await aclient.update_item(**leaderboard_sk_request(lb_pk, user_id, lb_resp))
+    return scored_item
+
+
+def process_all_threaded(jobs):
+    """
+    Run process_prediction for every job on a thread pool.
+    Returns each job's scored item (or None), or the exception it raised.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = [ex.submit(process_prediction, *job) for job in jobs]
+    return [future.exception() or future.result() for future in futures]
+
+
+async def process_all_async(jobs):
+    """
+    Run every job on one event loop with at most ASYNC_CONCURRENCY in flight.
+    Same return shape as process_all_threaded.
+    """
+    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    async with aio_session.client("dynamodb", config=aio_config) as aclient:
+        return await asyncio.gather(
+            *(process_prediction_async(aclient, sem, *job) for job in jobs),
+            return_exceptions=True,
+        )
+
+
 def handler(event, context):
     """
     Update user scores based on race results.
@@ -177,8 +523,6 @@ def handler(event, context):
     if not TABLE_NAME:
         raise ValueError("TABLE_NAME environment variable is not set")
 
-    table = dynamodb.Table(TABLE_NAME)
-
     # 1. Fetch race to check for sprint
     race_pk = f"{category}#{season}"
     race_sk = f"RACE#{race_id}"
@@ -206,72 +550,54 @@ def handler(event, context):
 
     print(f"Found {len(predictions)} predictions to update")
     timestamp = datetime.utcnow().isoformat()
+    result_index = build_result_index(result_data, has_sprint)
+    lb_pk = f"LEADERBOARD#{category}#{season}"
 
-    # 3. Process each prediction
+    # 3. Score every prediction in one vectorized pass; any that can't be
+    # (unparseable or irregular) are scored on their worker, which reports the error
+    parsed = []
     for pred_item in predictions:
-        user_id = pred_item["userId"]
-        user_pred_data = (
-            json.loads(pred_item["prediction"])
-            if isinstance(pred_item["prediction"], str)
-            else pred_item["prediction"]
-        )
-
-        # Calculate points for this race
-        driver_points = calculate_driver_points(user_pred_data, result_data, has_sprint)
-        bonus_points = calculate_bonus_points(user_pred_data, result_data)
-
-        total_race_points = (
-            sum(d["points"] for d in driver_points.values()) + bonus_points
-        )
-
-        # Update RacePrediction
-        padded_race = get_padded_points(total_race_points)
-        new_by_leaderboard_sk = f"{padded_race}#USER#{user_id}"
-
-        table.update_item(
-            Key={"PK": pred_item["PK"], "SK": pred_item["SK"]},
-            UpdateExpression="SET points = :p, byLeaderboardSK = :sk, updatedAt = :u",
-            ExpressionAttributeValues={
-                ":p": total_race_points,
-                ":sk": new_by_leaderboard_sk,
-                ":u": timestamp,
-            },
-        )
-
-        # 4. Update LeaderboardEntry (Total points)
-        # PK: LEADERBOARD#{category}#{season}
-        # SK: USER#{user_id}
-        lb_pk = f"LEADERBOARD#{category}#{season}"
-        lb_sk = f"USER#{user_id}"
-
-        # Fetch current entry to avoid potential issues with atomic increments if running multiple times
-        # though in a Step Function flow for results this should be fine.
-        lb_resp = table.get_item(Key={"PK": lb_pk, "SK": lb_sk})
-        if "Item" in lb_resp:
-            lb_item = lb_resp["Item"]
-            # We add current race points to their previous total
-            new_total = int(lb_item.get("totalPoints", 0)) + total_race_points
-            new_count = int(lb_item.get("numberOfRaces", 0)) + 1
-
-            new_lb_padded = get_padded_points(new_total)
-            new_lb_sk = f"{new_lb_padded}#USER#{user_id}"
-
-            table.update_item(
-                Key={"PK": lb_pk, "SK": lb_sk},
-                UpdateExpression="SET totalPoints = :tp, numberOfRaces = :nr, byLeaderboardSK = :sk, updatedAt = :u",
-                ExpressionAttributeValues={
-                    ":tp": new_total,
-                    ":nr": new_count,
-                    ":sk": new_lb_sk,
-                    ":u": timestamp,
-                },
-            )
-        else:
-            # If for some reason the leaderboard entry doesn't exist, we skip or could create it
-            # In this project, initMyLeaderboards usually creates it
+        try:
+            parsed.append(load_prediction(pred_item))
+        except Exception:
+            parsed.append(None)
+    totals = calculate_scores_bulk(parsed, result_index)
+
+    # 4. Process each prediction
+    # Each prediction is independent and bound by DynamoDB round-trips, so fan out:
+    # on one event loop when aioboto3 is packaged, otherwise on a thread pool
+    jobs = [
+        (pred_item, result_index, timestamp, lb_pk, total)
+        for pred_item, total in zip(predictions, totals)
+    ]
+    if aio_session is not None:
+        results = asyncio.run(process_all_async(jobs))
+    else:
+        results = process_all_threaded(jobs)
+
+    errors = []
+    scored_items = []
+    for pred_item, result in zip(predictions, results):
+        if isinstance(result, BaseException):
             print(
-                f"Warning: No leaderboard entry found for user {user_id} in {category}#{season}"
+                f"Error updating prediction {pred_item['PK']}/{pred_item['SK']}: {result}"
             )
+            errors.append(result)
+        elif result is not None:
+            scored_items.append(result)
+
+    # UpdateItem has no batch API, but the scored predictions are complete items,
+    # so write them back 25 per BatchWriteItem call
+    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as writer:
+        for item in scored_items:
+            writer.put_item(Item=item)
+    print(f"Wrote {len(scored_items)} scored predictions")
+
+    if errors:
+        # Surface a failure to Step Functions once every other user has been processed
+        raise RuntimeError(
+            f"Failed to update {len(errors)} of {len(predictions)} predictions: {errors[0]}"
+        ) from errors[0]
 
     return {
         "status": "SCORES_UPDATED",
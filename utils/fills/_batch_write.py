@@ -0,0 +1,141 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.config import Config
+
+# DynamoDB BatchWriteItem supports max 25 items per batch
+BATCH_SIZE = 25
+# Concurrent BatchWriteItem calls, so the chunks' round trips overlap
+WRITE_WORKERS = 8
+# Retries of a chunk's UnprocessedItems before the write is failed
+MAX_UNPROCESSED_RETRIES = 8
+# DynamoDB BatchGetItem supports max 100 keys per request
+GET_BATCH_SIZE = 100
+# Attributes left out of contentHash, so a re-run with new timestamps matches
+UNHASHED_ATTRIBUTES = ("createdAt", "updatedAt", "contentHash")
+
+_serializer = TypeSerializer()
+
+# One client per region, created on first use and reused by later main() calls
+_clients = {}
+
+
+def get_client(region_name=None):
+    """Low-level DynamoDB client with a pool large enough for WRITE_WORKERS."""
+    client = _clients.get(region_name)
+    if client is None:
+        client = _clients[region_name] = boto3.client(
+            "dynamodb",
+            region_name=region_name,
+            config=Config(
+                tcp_keepalive=True,
+                max_pool_connections=16,
+                retries={"mode": "adaptive", "max_attempts": 10},
+            ),
+        )
+    return client
+
+
+def serialize_item(item: dict) -> dict:
+    """Convert a plain item to DynamoDB wire format ({"S": ...}, {"N": ...})."""
+    return {k: _serializer.serialize(v) for k, v in item.items()}
+
+
+def chunks(seq: list, size: int = BATCH_SIZE):
+    """Yield consecutive slices of seq, each at most size long."""
+    for i in range(0, len(seq), size):
+        yield seq[i : i + size]
+
+
+def write_chunk(client, table_name: str, requests: list) -> int:
+    """
+    Send one chunk of up to 25 write requests, resending UnprocessedItems.
+    Returns the number of requests DynamoDB accepted.
+    """
+    sent = len(requests)
+    attempt = 0
+    while True:
+        response = client.batch_write_item(RequestItems={table_name: requests})
+        requests = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not requests:
+            return sent
+
+        # Throttled: back off exponentially and resend only what was left over
+        attempt += 1
+        if attempt > MAX_UNPROCESSED_RETRIES:
+            raise RuntimeError(
+                f"{len(requests)} items still unprocessed after {MAX_UNPROCESSED_RETRIES} retries"
+            )
+        time.sleep(min(2**attempt * 0.05, 2.0))
+
+
+def put_items(client, table_name: str, items: list) -> int:
+    """
+    Put wire-format items in chunks of 25, running the chunks on a pool of
+    WRITE_WORKERS. Returns the number of items written; raises if any chunk
+    could not be written in full.
+    """
+    requests = [{"PutRequest": {"Item": item}} for item in items]
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        futures = [
+            executor.submit(write_chunk, client, table_name, chunk)
+            for chunk in chunks(requests)
+        ]
+    return sum(future.result() for future in futures)
+
+
+def with_content_hash(item: dict) -> dict:
+    """Return the wire-format item with a contentHash of everything but its timestamps."""
+    content = {k: v for k, v in item.items() if k not in UNHASHED_ATTRIBUTES}
+    digest = hashlib.blake2b(
+        json.dumps(content, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+    return {**item, "contentHash": {"S": digest}}
+
+
+def stored_hashes(client, table_name: str, keys: list) -> dict:
+    """Map (PK, SK) -> stored contentHash for the keys that exist in the table."""
+    hashes = {}
+    for chunk in chunks(keys, GET_BATCH_SIZE):
+        request = {
+            table_name: {
+                "Keys": chunk,
+                "ProjectionExpression": "PK, SK, contentHash",
+            }
+        }
+        attempt = 0
+        while request:
+            response = client.batch_get_item(RequestItems=request)
+            for item in response.get("Responses", {}).get(table_name, []):
+                stored = item.get("contentHash", {}).get("S")
+                hashes[(item["PK"]["S"], item["SK"]["S"])] = stored
+            request = response.get("UnprocessedKeys") or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    raise RuntimeError(
+                        f"Keys still unprocessed after {MAX_UNPROCESSED_RETRIES} retries"
+                    )
+                time.sleep(min(2**attempt * 0.05, 2.0))
+    return hashes
+
+
+def put_changed_items(client, table_name: str, items: list) -> tuple[int, int]:
+    """
+    Put only the items whose contentHash differs from the stored copy (or that
+    don't exist yet). Comparing via BatchGetItem costs read capacity instead of a
+    full write per unchanged item. Returns (written, skipped).
+    """
+    keys = [{"PK": item["PK"], "SK": item["SK"]} for item in items]
+    hashes = stored_hashes(client, table_name, keys)
+    changed = [
+        item
+        for item in items
+        if hashes.get((item["PK"]["S"], item["SK"]["S"])) != item["contentHash"]["S"]
+    ]
+    written = put_items(client, table_name, changed) if changed else 0
+    return written, len(items) - len(changed)
@@ -0,0 +1,17 @@
+import json
+from pathlib import Path
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Seed records live as JSON next to the scripts, in utils/fills/data
+dataDir = Path(__file__).with_name("data")
+
+
+def loadDataFile(fileName: str) -> list:
+    """Parse one JSON data file from utils/fills/data."""
+    return _json_loads((dataDir / fileName).read_bytes())
@@ -0,0 +1,50 @@
+"""2026 F1 driver line-up and team colors, shared by the fill scripts."""
+
+import sys
+from types import MappingProxyType
+from typing import NamedTuple
+
+from _data import loadDataFile
+
+
+class Driver(NamedTuple):
+    driverId: str
+    name: str
+    number: int
+    team: str
+    # filled from teamColors below
+    teamColor: str = "not defined"
+
+
+# Team colors (hex) — used for teams where a hex value is available.
+# For Audi/Cadillac: not defined (no authoritative hex palette published as hex).
+# Read-only, so a script can't change a color for every later user.
+teamColors = MappingProxyType(
+    {
+        # Orange / green / silver are already fine
+        "McLaren": "#F47600",
+        "Mercedes": "#00D7B6",
+        "Ferrari": "#ED1131",
+        "Aston Martin": "#229971",
+        "Alpine": "#EC4899",
+        # Adjusted for clarity
+        "Red Bull": "#1E3A8A",  # deep royal blue
+        "Racing Bulls": "#3B82F6",  # electric blue
+        "Williams": "#0EA5E9",  # cyan blue
+        # Special cases you asked for
+        "Haas": "#0F0F12",  # dark red
+        "Audi": "#8B1D2C",  # premium dark red
+        "Cadillac": "#002868",  # navy racing blue
+    }
+)
+
+
+drivers2026F1 = [Driver(**d) for d in loadDataFile("drivers_2026.json")]
+
+# Resolve each driver's team color once, here, instead of in every item builder.
+# Team names are interned so records of the same team share one string object;
+# each JSON-decoded string is otherwise a separate copy.
+drivers2026F1 = [
+    d._replace(team=sys.intern(d.team), teamColor=teamColors.get(d.team, "not defined"))
+    for d in drivers2026F1
+]
@@ -1,6 +1,9 @@
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
 
 TABLE_NAME = "ApexEntity-5jcwvxujrfbo3hrhevdplmyhsi-NONE"
 
@@ -8,10 +11,23 @@ SEASON_FROM = "2025"
 SEASON_TO = "2026"
 SK_TARGET = "TOTALPOINTS"
 
+# PK season segment swapped by swap_season_in_pk
+SEASON_NEEDLE = f"#season#{SEASON_FROM}"
+SEASON_REPL = f"#season#{SEASON_TO}"
+
 # GSI (from your schema): PK=season, SK=null
 GSI_SEASON = "apexEntitiesBySeason"
 
-ddb = boto3.resource("dynamodb")
+MAX_WORKERS = 32
+
+ddb = boto3.resource(
+    "dynamodb",
+    config=Config(
+        tcp_keepalive=True,
+        max_pool_connections=MAX_WORKERS,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    ),
+)
 table = ddb.Table(TABLE_NAME)
 
 
@@ -20,14 +36,12 @@ def now_iso() -> str:
 
 
 def swap_season_in_pk(pk: str) -> str:
-    needle = f"#season#{SEASON_FROM}"
-    repl = f"#season#{SEASON_TO}"
-    if needle not in pk:
-        raise ValueError(f"PK missing season segment '{needle}': {pk}")
-    return pk.replace(needle, repl, 1)
+    if SEASON_NEEDLE not in pk:
+        raise ValueError(f"PK missing season segment '{SEASON_NEEDLE}': {pk}")
+    return pk.replace(SEASON_NEEDLE, SEASON_REPL, 1)
 
 
-def make_2026_copy(item: dict) -> dict:
+def make_2026_copy(item: dict, ts: str) -> dict:
     new_item = dict(item)
 
     # Keys
@@ -40,7 +54,6 @@ def make_2026_copy(item: dict) -> dict:
     new_item["races"] = 0
 
     # Keep other attributes the same; update timestamps (recommended)
-    ts = now_iso()
     new_item["createdAt"] = ts
     new_item["updatedAt"] = ts
 
@@ -49,50 +62,62 @@ def make_2026_copy(item: dict) -> dict:
 
 def iter_totalpoints_2025():
     """
-    Pull all season=2025 items via GSI, then filter to SK=TOTALPOINTS in code.
-    (Because your GSI apexEntitiesBySeason has only PK=season, no SK to filter on.)
+    Pull all season=2025 items via GSI, filtered to SK=TOTALPOINTS by DynamoDB.
+    (Because your GSI apexEntitiesBySeason has only PK=season, no SK to filter on,
+    the filter still reads every season item but only matches come over the wire.)
     """
     last_key = None
     while True:
         kwargs = {
             "IndexName": GSI_SEASON,
             "KeyConditionExpression": Key("season").eq(SEASON_FROM),
+            "FilterExpression": Attr("SK").eq(SK_TARGET),
         }
         if last_key:
             kwargs["ExclusiveStartKey"] = last_key
 
         resp = table.query(**kwargs)
-        for it in resp.get("Items", []):
-            if it.get("SK") == SK_TARGET:
-                yield it
+        yield from resp.get("Items", [])
 
         last_key = resp.get("LastEvaluatedKey")
         if not last_key:
             break
 
 
+def put_one(item: dict, ts: str) -> str:
+    """Create the 2026 copy of one item; returns "written", "skipped" or "error"."""
+    try:
+        # a bad PK shape raises ValueError here; count it like any other failed item
+        new_item = make_2026_copy(item, ts)
+        # don't overwrite if the 2026 record already exists
+        table.put_item(
+            Item=new_item,
+            ConditionExpression="attribute_not_exists(PK) AND attribute_not_exists(SK)",
+        )
+        return "written"
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return "skipped"
+    except Exception as e:
+        print(f"Error writing copy of {item.get('PK')}: {e}")
+        return "error"
+
+
 def main():
-    read_n = 0
-    written_n = 0
-    skipped_exists_n = 0
-
-    for item in iter_totalpoints_2025():
-        read_n += 1
-        new_item = make_2026_copy(item)
-
-        try:
-            # don't overwrite if the 2026 record already exists
-            table.put_item(
-                Item=new_item,
-                ConditionExpression="attribute_not_exists(PK) AND attribute_not_exists(SK)",
-            )
-            written_n += 1
-        except table.meta.client.exceptions.ConditionalCheckFailedException:
-            skipped_exists_n += 1
-
-    print(f"Read TOTALPOINTS 2025: {read_n}")
-    print(f"Created TOTALPOINTS 2026: {written_n}")
-    print(f"Skipped (already existed): {skipped_exists_n}")
+    # One timestamp for the whole run
+    ts = now_iso()
+    items = list(iter_totalpoints_2025())
+
+    # Conditional puts can't go through BatchWriteItem, so overlap them instead
+    outcomes = {"written": 0, "skipped": 0, "error": 0}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = [ex.submit(put_one, item, ts) for item in items]
+        for future in as_completed(futures):
+            outcomes[future.result()] += 1
+
+    print(f"Read TOTALPOINTS 2025: {len(items)}")
+    print(f"Created TOTALPOINTS 2026: {outcomes['written']}")
+    print(f"Skipped (already existed): {outcomes['skipped']}")
+    print(f"Errors: {outcomes['error']}")
 
 
 if __name__ == "__main__":
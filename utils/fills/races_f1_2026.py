@@ -1,8 +1,15 @@
 import os
 from datetime import datetime, timezone
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
-import boto3
+from _batch_write import (
+    get_client,
+    put_changed_items,
+    serialize_item,
+    with_content_hash,
+)
+from _data import loadDataFile
 
 
 # ---- config ----
@@ -11,8 +18,13 @@ tableName = os.environ.get(
 )
 awsRegion = os.environ.get("AWS_REGION", "us-east-2")
 
+# Shared by every race item
+season = "2026"
+seasonPk = f"f1#{season}"
+
 # UK time (Europe/London) -> UTC ISO8601 with 'Z'
 london = ZoneInfo("Europe/London")
+isoFmt = "%Y-%m-%dT%H:%M:%SZ"
 
 
 def londonToUtcZ(dtStr: str) -> str:
@@ -20,293 +32,90 @@ def londonToUtcZ(dtStr: str) -> str:
     dtStr: 'YYYY-MM-DD HH:MM' interpreted as Europe/London time.
     Returns: UTC ISO8601 string ending with 'Z' (e.g. '2026-03-07T05:00:00Z')
     """
-    naive = datetime.strptime(dtStr, "%Y-%m-%d %H:%M")
-    local = naive.replace(tzinfo=london)
+    # Fixed-width format, so slice the fields instead of going through strptime
+    local = datetime(
+        int(dtStr[0:4]),
+        int(dtStr[5:7]),
+        int(dtStr[8:10]),
+        int(dtStr[11:13]),
+        int(dtStr[14:16]),
+        tzinfo=london,
+    )
     utc = local.astimezone(timezone.utc)
-    return utc.replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
-
-
-def makeRaceItem(r: dict, nowIso: str) -> dict:
-    raceId = r["raceId"]
+    return utc.strftime(isoFmt)
+
+
+class Race(NamedTuple):
+    raceId: str
+    raceName: str
+    country: str
+    circuit: str
+    hasSprint: bool
+    qualyLondon: str
+    raceLondon: str
+    category: str = "f1"  # not defined -> adjust if needed
+    status: str = "scheduled"  # not defined -> adjust if needed
+    # UTC Zulu versions of the London times, filled in at import
+    qualyUtc: str = ""
+    raceUtc: str = ""
+
+
+def makeRaceItem(r: Race, nowIso: str) -> dict:
+    raceId = r.raceId
     return {
-        "PK": "f1#2026",
+        "PK": seasonPk,
         "SK": f"RACE#{raceId}",
         # required attributes (per your RACE card)
         "entityType": "RACE",
-        "season": "2026",
-        "category": r.get("category", "f1"),  # not defined -> adjust if needed
-        "status": r.get("status", "scheduled"),  # not defined -> adjust if needed
+        "season": season,
+        "category": r.category,
+        "status": r.status,
         "raceId": raceId,
-        "raceName": r["raceName"],
-        "country": r["country"],
-        "circuit": r["circuit"],
-        "hasSprint": bool(r["hasSprint"]),
-        # stored as UTC Zulu timestamps (derived from UK times)
-        "qualyDate": londonToUtcZ(r["qualyLondon"]),
-        "raceDate": londonToUtcZ(r["raceLondon"]),
+        "raceName": r.raceName,
+        "country": r.country,
+        "circuit": r.circuit,
+        "hasSprint": bool(r.hasSprint),
+        # stored as UTC Zulu timestamps (derived from UK times at import)
+        "qualyDate": r.qualyUtc,
+        "raceDate": r.raceUtc,
         "createdAt": nowIso,
         "updatedAt": nowIso,
     }
 
 
+# One record per round, in calendar order
+races2026 = [Race(**r) for r in loadDataFile("races_2026.json")]
+
+# Convert every session time once, up front
 races2026 = [
-    # Round 1
-    {
-        "raceId": "australia2026",
-        "raceName": "Australian Grand Prix",
-        "country": "Australia",
-        "circuit": "Albert Park Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-03-07 05:00",
-        "raceLondon": "2026-03-08 04:00",
-    },
-    # Round 2
-    {
-        "raceId": "china2026",
-        "raceName": "Chinese Grand Prix",
-        "country": "China",
-        "circuit": "Shanghai International Circuit",
-        "hasSprint": True,
-        "qualyLondon": "2026-03-13 07:30",
-        "raceLondon": "2026-03-15 07:00",
-    },
-    # Round 3
-    {
-        "raceId": "japan2026",
-        "raceName": "Japanese Grand Prix",
-        "country": "Japan",
-        "circuit": "Suzuka Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-03-28 06:00",
-        "raceLondon": "2026-03-29 06:00",
-    },
-    # Round 4
-    {
-        "raceId": "bahrain2026",
-        "raceName": "Bahrain Grand Prix",
-        "country": "Bahrain",
-        "circuit": "Bahrain International Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-04-11 16:00",
-        "raceLondon": "2026-04-12 15:00",
-    },
-    # Round 5
-    {
-        "raceId": "saudi-arabia2026",
-        "raceName": "Saudi Arabian Grand Prix",
-        "country": "Saudi Arabia",
-        "circuit": "Jeddah Corniche Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-04-18 17:00",
-        "raceLondon": "2026-04-19 17:00",
-    },
-    # Round 6
-    {
-        "raceId": "miami2026",
-        "raceName": "Miami Grand Prix",
-        "country": "United States",
-        "circuit": "Miami International Autodrome",
-        "hasSprint": True,
-        "qualyLondon": "2026-05-01 20:30",
-        "raceLondon": "2026-05-03 20:00",
-    },
-    # Round 7
-    {
-        "raceId": "canada2026",
-        "raceName": "Canadian Grand Prix",
-        "country": "Canada",
-        "circuit": "Circuit Gilles-Villeneuve",
-        "hasSprint": True,
-        "qualyLondon": "2026-05-22 20:30",
-        "raceLondon": "2026-05-24 20:00",
-    },
-    # Round 8
-    {
-        "raceId": "monaco2026",
-        "raceName": "Monaco Grand Prix",
-        "country": "Monaco",
-        "circuit": "Circuit de Monaco",
-        "hasSprint": False,
-        "qualyLondon": "2026-06-06 14:00",
-        "raceLondon": "2026-06-07 13:00",
-    },
-    # Round 9
-    {
-        "raceId": "barcelona-catalunya2026",
-        "raceName": "Barcelona-Catalunya Grand Prix",
-        "country": "Spain",
-        "circuit": "Circuit de Barcelona-Catalunya",
-        "hasSprint": False,
-        "qualyLondon": "2026-06-13 14:00",
-        "raceLondon": "2026-06-14 13:00",
-    },
-    # Round 10
-    {
-        "raceId": "austria2026",
-        "raceName": "Austrian Grand Prix",
-        "country": "Austria",
-        "circuit": "Red Bull Ring",
-        "hasSprint": False,
-        "qualyLondon": "2026-06-27 14:00",
-        "raceLondon": "2026-06-28 13:00",
-    },
-    # Round 11
-    {
-        "raceId": "great-britain2026",
-        "raceName": "British Grand Prix",
-        "country": "United Kingdom",
-        "circuit": "Silverstone Circuit",
-        "hasSprint": True,
-        "qualyLondon": "2026-07-04 15:00",
-        "raceLondon": "2026-07-05 14:00",
-    },
-    # Round 12
-    {
-        "raceId": "belgium2026",
-        "raceName": "Belgian Grand Prix",
-        "country": "Belgium",
-        "circuit": "Circuit de Spa-Francorchamps",
-        "hasSprint": False,
-        "qualyLondon": "2026-07-18 14:00",
-        "raceLondon": "2026-07-19 13:00",
-    },
-    # Round 13
-    {
-        "raceId": "hungary2026",
-        "raceName": "Hungarian Grand Prix",
-        "country": "Hungary",
-        "circuit": "Hungaroring",
-        "hasSprint": False,
-        "qualyLondon": "2026-07-25 14:00",
-        "raceLondon": "2026-07-26 13:00",
-    },
-    # Round 14
-    {
-        "raceId": "netherlands2026",
-        "raceName": "Dutch Grand Prix",
-        "country": "Netherlands",
-        "circuit": "Circuit Zandvoort",
-        "hasSprint": True,
-        "qualyLondon": "2026-08-21 14:30",
-        "raceLondon": "2026-08-23 13:00",
-    },
-    # Round 15
-    {
-        "raceId": "italy2026",
-        "raceName": "Italian Grand Prix",
-        "country": "Italy",
-        "circuit": "Autodromo Nazionale Monza",
-        "hasSprint": False,
-        "qualyLondon": "2026-09-05 14:00",
-        "raceLondon": "2026-09-06 13:00",
-    },
-    # Round 16
-    {
-        "raceId": "spain2026",
-        "raceName": "Spanish Grand Prix",
-        "country": "Spain",
-        "circuit": "Madring",
-        "hasSprint": False,
-        "qualyLondon": "2026-09-12 14:00",
-        "raceLondon": "2026-09-13 13:00",
-    },
-    # Round 17
-    {
-        "raceId": "azerbaijan2026",
-        "raceName": "Azerbaijan Grand Prix",
-        "country": "Azerbaijan",
-        "circuit": "Baku City Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-09-25 12:00",
-        "raceLondon": "2026-09-26 11:00",
-    },
-    # Round 18
-    {
-        "raceId": "singapore2026",
-        "raceName": "Singapore Grand Prix",
-        "country": "Singapore",
-        "circuit": "Marina Bay Street Circuit",
-        "hasSprint": True,
-        "qualyLondon": "2026-10-09 12:30",
-        "raceLondon": "2026-10-11 12:00",
-    },
-    # Round 19
-    {
-        "raceId": "united-states2026",
-        "raceName": "United States Grand Prix",
-        "country": "United States",
-        "circuit": "Circuit of The Americas",
-        "hasSprint": False,
-        "qualyLondon": "2026-10-24 21:00",
-        "raceLondon": "2026-10-25 20:00",
-    },
-    # Round 20
-    {
-        "raceId": "mexico2026",
-        "raceName": "Mexico City Grand Prix",
-        "country": "Mexico",
-        "circuit": "Autódromo Hermanos Rodríguez",
-        "hasSprint": False,
-        "qualyLondon": "2026-10-31 21:00",
-        "raceLondon": "2026-11-01 20:00",
-    },
-    # Round 21
-    {
-        "raceId": "brazil2026",
-        "raceName": "São Paulo Grand Prix",
-        "country": "Brazil",
-        "circuit": "Autódromo José Carlos Pace",
-        "hasSprint": False,
-        "qualyLondon": "2026-11-07 18:00",
-        "raceLondon": "2026-11-08 17:00",
-    },
-    # Round 22
-    {
-        "raceId": "las-vegas2026",
-        "raceName": "Las Vegas Grand Prix",
-        "country": "United States",
-        "circuit": "Las Vegas Strip Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-11-21 04:00",
-        "raceLondon": "2026-11-22 04:00",
-    },
-    # Round 23
-    {
-        "raceId": "qatar2026",
-        "raceName": "Qatar Grand Prix",
-        "country": "Qatar",
-        "circuit": "Lusail International Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-11-28 18:00",
-        "raceLondon": "2026-11-29 16:00",
-    },
-    # Round 24
-    {
-        "raceId": "united-arab-emirates2026",
-        "raceName": "Abu Dhabi Grand Prix",
-        "country": "United Arab Emirates",
-        "circuit": "Yas Marina Circuit",
-        "hasSprint": False,
-        "qualyLondon": "2026-12-05 14:00",
-        "raceLondon": "2026-12-06 13:00",
-    },
+    r._replace(
+        qualyUtc=londonToUtcZ(r.qualyLondon), raceUtc=londonToUtcZ(r.raceLondon)
+    )
+    for r in races2026
+]
+
+# Only the timestamps change between runs, so build the items once at import,
+# already in DynamoDB wire format and with the contentHash used to skip unchanged ones
+raceItemTemplates = [
+    with_content_hash(serialize_item(makeRaceItem(r, None))) for r in races2026
 ]
 
 
 def main() -> None:
-    dynamodb = boto3.resource("dynamodb", region_name=awsRegion)
-    table = dynamodb.Table(tableName)
+    client = get_client(awsRegion)
 
-    nowIso = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    nowIso = datetime.now(timezone.utc).strftime(isoFmt)
 
-    items = [makeRaceItem(r, nowIso) for r in races2026]
+    nowAttr = {"S": nowIso}
+    items = [
+        {**tpl, "createdAt": nowAttr, "updatedAt": nowAttr} for tpl in raceItemTemplates
+    ]
 
-    # BatchWriter handles retries/unprocessed items automatically
-    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
-        for item in items:
-            batch.put_item(Item=item)
+    # Races already stored with the same content are left alone; the rest go
+    # out in concurrent chunks of 25 with unprocessed items retried
+    written, skipped = put_changed_items(client, tableName, items)
 
-    print(f"Inserted/updated {len(items)} races into {tableName}")
+    print(f"Inserted/updated {written} races into {tableName} ({skipped} unchanged)")
 
 
 if __name__ == "__main__":
@@ -11,12 +11,17 @@ Requires:
 Permissions:
   dynamodb:DescribeTable, dynamodb:DescribeTimeToLive, dynamodb:Scan
 (Optional) Query permissions if you extend sampling via GSIs.
+Caching:
+  DescribeTable/DescribeTimeToLive results are kept in ~/.cache/schema_cards for 24 h;
+  pass --refresh-schema to describe the table again.
 """
-import argparse, sys, json, math, datetime
+import argparse, os, sys, json, math, time, datetime, decimal
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import boto3, botocore
+    from boto3.dynamodb.conditions import Attr
 except Exception as e:
     print("This script requires boto3. Install with: pip install boto3 botocore", file=sys.stderr)
     raise
@@ -33,7 +38,9 @@ GLOBAL SECONDARY INDEXES
 {gsi_block}
 """
 
-ENTITY_BLOCK_TEMPLATE = """
+def render_entity(entity, pk_pattern, sk_pattern, required_attrs, optional_attrs, index_refs, access_patterns, examples):
+    # The entity block template, as an f-string so nothing is parsed per call
+    return f"""
 ## {entity}
 Keys:
 - PK pattern: {pk_pattern}
@@ -52,40 +59,47 @@ Examples
 def safe_join_list(lst):
     return ", ".join(lst) if lst else "—"
 
+def trim_example(ex, pk, sk):
+    # Always include keys, then up to 6 more attrs
+    key_first = []
+    if pk in ex: key_first.append(pk)
+    if sk in ex and sk != pk: key_first.append(sk)
+    rest = [k for k in ex if k not in key_first]
+    return {k: ex[k] for k in key_first + rest[:6]}
+
+# Attribute names (lowercased) that hold an explicit entity type
+ENTITY_TYPE_KEYS = frozenset(("entitytype","type","_et","_entity"))
+
 def detect_entity(item, pk_name, sk_name):
+    item_get = item.get
     # 1) Prefer explicit entityType (case-insensitive)
-    for k in list(item.keys()):
-        if k.lower() in ("entitytype","type","_et","_entity"):
-            v = item[k]
-            if isinstance(v, str) and v.strip():
-                return v.strip().upper(), {"pk":"<unknown>", "sk":f"{item.get(sk_name,'')}"}
+    for k, v in item.items():
+        if k.lower() in ENTITY_TYPE_KEYS and isinstance(v, str) and v.strip():
+            return v.strip().upper(), {"pk":"<unknown>", "sk":f"{item_get(sk_name,'')}"}
     # 2) Derive from SK
-    sk = item.get(sk_name, "")
+    sk = item_get(sk_name, "")
     if isinstance(sk, str) and sk:
-        if "#" in sk:
-            prefix = sk.split("#",1)[0]
-            if prefix:
-                return prefix.upper(), {"pk":"<unknown>", "sk":f"{prefix}#{{...}}"}
-        else:
+        prefix, sep, _ = sk.partition("#")
+        if not sep:
             return sk.upper(), {"pk":"<unknown>", "sk":sk}
+        if prefix:
+            return prefix.upper(), {"pk":"<unknown>", "sk":f"{prefix}#{{...}}"}
     # 3) Fallback from PK if it looks namespaced
-    pk = item.get(pk_name, "")
-    if isinstance(pk, str) and "#" in pk:
-        prefix = pk.split("#",1)[0]
-        return prefix.upper(), {"pk":f"{prefix}#{{...}}", "sk":"<unknown>"}
+    pk = item_get(pk_name, "")
+    if isinstance(pk, str):
+        prefix, sep, _ = pk.partition("#")
+        if sep:
+            return prefix.upper(), {"pk":f"{prefix}#{{...}}", "sk":"<unknown>"}
     return "UNKNOWN", {"pk":"<unknown>", "sk":"<unknown>"}
 
-def summarize_required_optional(items, exclude=set()):
+def summarize_required_optional(counts, n, exclude=set()):
     # Determine required vs optional by frequency threshold (>= 0.9 of items = required)
-    if not items:
+    # counts: attribute name -> number of the n sampled items that carry it
+    if not n:
         return [], []
-    counts = Counter()
-    n = len(items)
-    for it in items:
-        for k in it.keys():
-            counts[k]+=1
-    required = [k for k,c in counts.items() if c >= max(1, math.ceil(0.9*n)) and k not in exclude]
-    optional = [k for k,c in counts.items() if 1 <= c < max(1, math.ceil(0.9*n)) and k not in exclude]
+    threshold = max(1, math.ceil(0.9*n))
+    required = [k for k,c in counts.items() if c >= threshold and k not in exclude]
+    optional = [k for k,c in counts.items() if 1 <= c < threshold and k not in exclude]
     return sorted(required), sorted(optional)
 
 def fetch_table_info(client, table_name):
@@ -138,40 +152,123 @@ def fetch_table_info(client, table_name):
         "streams": streams
     }
 
-def sample_items(table, limit=500):
-    items = []
-    scan_kwargs = {"Limit": min(limit, 1000)}
+# DescribeTable/DescribeTimeToLive results are cached on disk between runs
+SCHEMA_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "schema_cards")
+SCHEMA_CACHE_TTL = 24 * 60 * 60  # seconds
+
+def load_or_fetch_table_info(client, table_name, refresh=False):
+    """fetch_table_info, served from a per-region JSON cache younger than SCHEMA_CACHE_TTL."""
+    path = os.path.join(SCHEMA_CACHE_DIR, f"{client.meta.region_name}_{table_name}.json")
+    if not refresh:
+        try:
+            if time.time() - os.path.getmtime(path) < SCHEMA_CACHE_TTL:
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass  # missing, unreadable or corrupt: describe the table again
+    meta = fetch_table_info(client, table_name)
+    try:
+        os.makedirs(SCHEMA_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)  # atomic, so readers never see a partial file
+    except OSError as e:
+        print(f"Could not cache table description: {e}", file=sys.stderr)
+    return meta
+
+def scan_pages(table, scan_kwargs, limit):
+    # Yield items as pages arrive so only one page is held in memory at a time
+    scan_kwargs = dict(scan_kwargs, Limit=min(limit, 1000))
     scanned = 0
     while True:
         resp = table.scan(**scan_kwargs)
-        items.extend(resp.get("Items",[]))
-        scanned += len(resp.get("Items",[]))
-        if scanned >= limit or "LastEvaluatedKey" not in resp:
-            break
+        for it in resp.get("Items",[]):
+            yield it
+            scanned += 1
+            if scanned >= limit:
+                return
+        if "LastEvaluatedKey" not in resp:
+            return
         scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
-    return items
 
-def guess_pk_sk_patterns(entity_items, pk_name, sk_name):
+def scan_segment(table, scan_kwargs, segment, total_segments, limit):
+    return list(scan_pages(table, dict(scan_kwargs, Segment=segment, TotalSegments=total_segments), limit))
+
+def sample_items(table, limit=500, entity_types=None, segments=1):
+    scan_kwargs = {}
+    if entity_types:
+        # Evaluated by DynamoDB, so other entities never cross the wire or get parsed
+        scan_kwargs["FilterExpression"] = Attr("entityType").is_in(entity_types)
+    if segments <= 1:
+        yield from scan_pages(table, scan_kwargs, limit)
+        return
+    # Parallel scan: each segment pages through its own slice of the table, so the
+    # round trips overlap; each contributes an equal share of the sample
+    per_segment = math.ceil(limit / segments)
+    with ThreadPoolExecutor(max_workers=segments) as ex:
+        futures = [ex.submit(scan_segment, table, scan_kwargs, s, segments, per_segment) for s in range(segments)]
+        scanned = 0
+        for future in futures:
+            for it in future.result():
+                yield it
+                scanned += 1
+                if scanned >= limit:
+                    return
+
+def new_key_stats():
+    # Running summary of one key attribute's values: only what guess_pk_sk_patterns reads
+    return {"n": 0, "prefixes": Counter(), "consts": Counter()}
+
+def note_key_value(stats, v):
+    stats["n"] += 1
+    if not isinstance(v,str): return
+    prefix, sep, _ = v.partition("#")
+    if sep:
+        stats["prefixes"][prefix] += 1
+        # Once any "PREFIX#" value is seen the constants are never used, so stop keeping them
+        stats["consts"].clear()
+    elif not stats["prefixes"]:
+        stats["consts"][v] += 1
+
+def guess_pk_sk_patterns(pk_stats, sk_stats):
     # Analyze patterns like "TYPE#id" and constant literals like "PROFILE"
-    sks = [it.get(sk_name,"") for it in entity_items if sk_name in it]
-    pks = [it.get(pk_name,"") for it in entity_items if pk_name in it]
-    def pattern_from(values):
-        if not values: return "<unknown>"
+    def pattern_from(stats):
+        if not stats["n"]: return "<unknown>"
         # If many values share "PREFIX#" then show PREFIX#...
-        prefixes = Counter()
-        for v in values:
-            if isinstance(v,str) and "#" in v:
-                prefixes[v.split("#",1)[0]] += 1
+        prefixes = stats["prefixes"]
         if prefixes:
             top = prefixes.most_common(1)[0][0]
             return f'{top}#{{...}}'
         # If many are identical constants like "PROFILE"
-        consts = Counter([v for v in values if isinstance(v,str)])
-        if consts and consts.most_common(1)[0][1] >= max(3, math.ceil(0.5*len(values))):
+        consts = stats["consts"]
+        if consts and consts.most_common(1)[0][1] >= max(3, math.ceil(0.5*stats["n"])):
             return consts.most_common(1)[0][0]
         # Fallback generic
         return "<var>"
-    return pattern_from(pks), pattern_from(sks)
+    return pattern_from(pk_stats), pattern_from(sk_stats)
+
+# -------- JSON helpers to avoid "Decimal is not JSON serializable" --------
+def json_default(obj):
+    """Convert the types json can't encode (Decimal, set, datetime) as they are met."""
+    if isinstance(obj, decimal.Decimal):
+        # Keep integers as int, others as float to preserve numeric sense in examples
+        try:
+            if obj == obj.to_integral_value():
+                return int(obj)
+            return float(obj)
+        except Exception:
+            return float(obj)  # safe fallback
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_json_safe(data):
+    # The encoder calls json_default only for values it can't handle, instead of
+    # copying the whole structure up front
+    return json.dumps(data, default=json_default, ensure_ascii=False)
 
 def main():
     ap = argparse.ArgumentParser(description="Generate Schema Cards markdown for a single-table DynamoDB design.")
@@ -180,6 +277,9 @@ def main():
     ap.add_argument("--profile", default=None, help="AWS profile name in your credentials")
     ap.add_argument("--sample", type=int, default=400, help="Max items to scan to infer entities (default 400)")
     ap.add_argument("--examples-per-entity", type=int, default=2, help="Number of example items to include per entity (default 2)")
+    ap.add_argument("--segments", type=int, default=4, help="Parallel Scan segments, each scanned by its own thread (default 4)")
+    ap.add_argument("--entity-types", default=None, help="Comma-separated entityType values to sample (filtered server-side); default samples every item")
+    ap.add_argument("--refresh-schema", action="store_true", help="Ignore the cached table description and call DescribeTable again")
     args = ap.parse_args()
 
     session_kwargs = {}
@@ -191,7 +291,7 @@ def main():
     table = resource.Table(args.table)
 
     try:
-        meta = fetch_table_info(client, args.table)
+        meta = load_or_fetch_table_info(client, args.table, refresh=args.refresh_schema)
     except botocore.exceptions.ClientError as e:
         sys.stderr.write(f"Error describing table: {e}\n")
         sys.exit(1)
@@ -229,83 +329,69 @@ def main():
         gsi_block=gsi_block
     )
 
-    # Sample items and group by entity
+    # Sample items and fold them into per-entity state as they are scanned; only
+    # key values, attribute counts and the first few examples are kept, not every item
+    sk_name = sk if sk != "<none>" else pk
+    entities = defaultdict(lambda: {"count": 0, "keys": Counter(), "pks": new_key_stats(), "sks": new_key_stats(), "examples": []})
+    entity_patterns = {}
     try:
-        items = sample_items(table, limit=args.sample)
+        entity_types = [t.strip() for t in args.entity_types.split(",") if t.strip()] if args.entity_types else None
+        for it in sample_items(table, limit=args.sample, entity_types=entity_types, segments=args.segments):
+            ent, patterns = detect_entity(it, pk, sk_name)
+            st = entities[ent]
+            st["count"] += 1
+            # Pass the keys view: update() with a dict would add its values as counts
+            st["keys"].update(it.keys())
+            if pk in it: note_key_value(st["pks"], it[pk])
+            if sk_name in it: note_key_value(st["sks"], it[sk_name])
+            if len(st["examples"]) < args.examples_per_entity:
+                st["examples"].append(it)
+            entity_patterns.setdefault(ent, patterns)
     except botocore.exceptions.ClientError as e:
         print(f"Scan failed (need dynamodb:Scan permission). Error: {e}", file=sys.stderr)
-        items = []
-
-    entities = defaultdict(list)
-    entity_patterns = {}
-    for it in items:
-        ent, patterns = detect_entity(it, pk, sk if sk != "<none>" else pk)
-        entities[ent].append(it)
-        entity_patterns.setdefault(ent, patterns)
 
     # Build entity blocks
     blocks = []
-    for ent, ent_items in sorted(entities.items(), key=lambda kv: (-len(kv[1]), kv[0])):
+    for ent, st in sorted(entities.items(), key=lambda kv: (-kv[1]["count"], kv[0])):
         exclude = set([pk])
         if sk != "<none>":
             exclude.add(sk)
-        req, opt = summarize_required_optional(ent_items, exclude=exclude)
+        req, opt = summarize_required_optional(st["keys"], st["count"], exclude=exclude)
 
-        pk_pat, sk_pat = guess_pk_sk_patterns(ent_items, pk, sk if sk != "<none>" else pk)
+        pk_pat, sk_pat = guess_pk_sk_patterns(st["pks"], st["sks"])
 
         # Index references that touch attributes in this entity
-        idx_refs_lines = []
-        for g in meta["gsis"]:
-            used = []
-            if g["PK"] in req or g["PK"] in opt or g["PK"] in (pk, sk):
-                used.append(g["PK"])
-            if g["SK"] and (g["SK"] in req or g["SK"] in opt or g["SK"] in (pk, sk)):
-                used.append(g["SK"])
-            if used:
-                proj = g["Projection"]
-                idx_refs_lines.append(f"- {g['Name']}: PK={g['PK']}, SK={g['SK'] or 'null'}, PROJECTION={proj}")
-        for l in meta["lsis"]:
-            if l["SK"] in req or l["SK"] in opt or l["SK"] in (pk, sk):
-                idx_refs_lines.append(f"- {l['Name']} (LSI): PK={l['PK']}, SK={l['SK']}, PROJECTION={l['Projection']}")
-        if not idx_refs_lines:
-            idx_refs_lines = ["- (none)"]
-        index_refs = "\n".join(idx_refs_lines)
+        touched = {pk, sk, *req, *opt}
+        idx_refs_lines = [
+            f"- {g['Name']}: PK={g['PK']}, SK={g['SK'] or 'null'}, PROJECTION={g['Projection']}"
+            for g in meta["gsis"] if g["PK"] in touched or (g["SK"] and g["SK"] in touched)
+        ] + [
+            f"- {l['Name']} (LSI): PK={l['PK']}, SK={l['SK']}, PROJECTION={l['Projection']}"
+            for l in meta["lsis"] if l["SK"] in touched
+        ]
+        index_refs = "\n".join(idx_refs_lines or ["- (none)"])
 
         # Access pattern placeholders
-        ap_lines = [
-            f"- Get{ent.title()}ByPK/SK: GetItem(PK=?, SK=?)",
-            f"- List{ent.title()}ByPK: Query PK=? [optional begins_with(SK,'{ent.title()}#')]"
-        ]
-        access_patterns = "\n".join(ap_lines)
+        title = ent.title()
+        access_patterns = "\n".join([
+            f"- Get{title}ByPK/SK: GetItem(PK=?, SK=?)",
+            f"- List{title}ByPK: Query PK=? [optional begins_with(SK,'{title}#')]"
+        ])
 
         # Examples (trim to keys + a few attrs)
-        examples_lines = []
-        for ex in ent_items[:args.examples_per_entity]:
-            shown = {}
-            # Always include keys, then up to 6 more attrs
-            key_first = []
-            if pk in ex: key_first.append(pk)
-            if sk in ex and sk != pk: key_first.append(sk)
-            rest = [k for k in ex.keys() if k not in key_first]
-            ordered = key_first + rest[:6]
-            for k in ordered:
-                shown[k] = ex[k]
-            examples_lines.append(f"- {json.dumps(shown, ensure_ascii=False)}")
-        if not examples_lines:
-            examples_lines = ["- (no examples sampled)"]
-        examples = "\n".join(examples_lines)
-
-        block = ENTITY_BLOCK_TEMPLATE.format(
+        examples_lines = [f"- {dumps_json_safe(trim_example(ex, pk, sk))}" for ex in st["examples"]]
+        examples = "\n".join(examples_lines or ["- (no examples sampled)"])
+
+        blocks.append(render_entity(
             entity=ent,
             pk_pattern=pk_pat,
             sk_pattern=sk_pat,
-            required_attrs=safe_join_list(req) if req else "—",
-            optional_attrs=safe_join_list(opt) if opt else "—",
+            required_attrs=safe_join_list(req),
+            optional_attrs=safe_join_list(opt),
             index_refs=index_refs,
             access_patterns=access_patterns,
             examples=examples
-        )
-        blocks.append(block)
+        ))
 
     md = header + "\nENTITIES\n" + ("\n".join(blocks) if blocks else "\n- (no items sampled; add examples manually)\n")
 
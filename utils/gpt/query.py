@@ -1,5 +1,6 @@
 from boto3.dynamodb.conditions import Key
-import boto3, itertools
+from concurrent.futures import ThreadPoolExecutor
+import boto3, itertools, time
 
 TBL = "ApexEntity-5jcwvxujrfbo3hrhevdplmyhsi-NONE"
 league_id = "league_1756501360381_2qendu23t"
@@ -8,6 +9,41 @@ race_id = "azerbaijan2025"
 ddb = boto3.resource("dynamodb")
 tbl = ddb.Table(TBL)
 
+# BatchGetItem takes at most 100 keys per request
+GET_BATCH_SIZE = 100
+MAX_WORKERS = 8
+MAX_UNPROCESSED_RETRIES = 8
+
+
+def chunked(iterable, n=GET_BATCH_SIZE):
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, n))
+        if not batch:
+            return
+        yield batch
+
+
+def fetch_chunk(chunk):
+    # Eventually consistent reads cost half the RCUs; fine for a one-off lookup
+    request = {TBL: {"Keys": chunk}}
+    items = []
+    attempt = 0
+    while request:
+        resp = ddb.batch_get_item(RequestItems=request)
+        items.extend(resp["Responses"].get(TBL, []))
+        # Throttled or over the 16 MB response cap: ask again for the rest
+        request = resp.get("UnprocessedKeys") or {}
+        if request:
+            attempt += 1
+            if attempt > MAX_UNPROCESSED_RETRIES:
+                raise RuntimeError(
+                    f"Keys still unprocessed after {MAX_UNPROCESSED_RETRIES} retries"
+                )
+            time.sleep(min(2**attempt * 0.05, 2.0))
+    return items
+
+
 # Step 1: league -> members (ONLY member rows)
 m = tbl.query(
     KeyConditionExpression=Key("PK").eq(f"league#{league_id}")
@@ -20,8 +56,10 @@ user_ids = [it["user_id"] for it in m["Items"]]  # safe: all are LEAGUE_MEMBER
 keys = [
     {"PK": f"prediction#{u}#{race_id}", "SK": "RACEPREDICTION"} for u in user_ids
 ]  # :contentReference[oaicite:5]{index=5}
-resp = ddb.batch_get_item(RequestItems={TBL: {"Keys": keys, "ConsistentRead": True}})
-all_predictions.extend(resp["Responses"].get(TBL, []))
+all_predictions = []
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+    for items in ex.map(fetch_chunk, chunked(keys)):
+        all_predictions.extend(items)
 
 print(all_predictions)
 print(f"members={len(user_ids)}, predictions_returned={len(all_predictions)}")
@@ -0,0 +1,38 @@
+import time
+
+# DynamoDB BatchGetItem supports max 100 keys per request
+GET_BATCH_SIZE = 100
+# Retries of a request's UnprocessedKeys before giving up
+MAX_UNPROCESSED_RETRIES = 8
+
+
+def existing_keys(dynamodb, table_name, keys):
+    """
+    Return the set of (PK, SK) pairs from keys that already exist in the table.
+    Reads only the key attributes, 100 keys per BatchGetItem call.
+    """
+    unique = list({(k["PK"], k["SK"]): k for k in keys}.values())
+    found = set()
+    for i in range(0, len(unique), GET_BATCH_SIZE):
+        request = {
+            table_name: {
+                "Keys": unique[i : i + GET_BATCH_SIZE],
+                "ProjectionExpression": "PK, SK",
+            }
+        }
+        attempt = 0
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for it in resp.get("Responses", {}).get(table_name, []):
+                found.add((it["PK"], it["SK"]))
+
+            request = resp.get("UnprocessedKeys") or {}
+            if request:
+                # Throttled: back off exponentially and ask again for the rest
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    raise RuntimeError(
+                        f"Keys still unprocessed after {MAX_UNPROCESSED_RETRIES} retries"
+                    )
+                time.sleep(min(2**attempt * 0.05, 2.0))
+    return found
@@ -0,0 +1,10 @@
+def page_query(table, **kwargs):
+    """Simple paginator for Query: follows LastEvaluatedKey and returns every item."""
+    items = []
+    resp = table.query(**kwargs)
+    items.extend(resp.get("Items", []))
+    while "LastEvaluatedKey" in resp:
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+        resp = table.query(**kwargs)
+        items.extend(resp.get("Items", []))
+    return items
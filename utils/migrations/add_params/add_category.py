@@ -1,13 +1,28 @@
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
 
 TABLE_NAME = "ApexEntity-5jcwvxujrfbo3hrhevdplmyhsi-NONE"
-GSI_SEASON = "apexEntitiesBySeason"  # PK = season
+GSI_ENTITYTYPE_CREATEDAT = "apexEntitiesByEntityTypeAndCreatedAt"  # PK = entityType
+# Every entity type whose rows use SK = TOTALPOINTS
+ENTITY_TYPES = ("LEADERBOARD", "LEAGUE_LEADERBOARD")
 SK_TARGET = "TOTALPOINTS"
 CATEGORY_VALUE = "F1"
 
-ddb = boto3.resource("dynamodb")
+MAX_WORKERS = 32
+
+# Adaptive retries back off on throttling from the parallel updates
+ddb = boto3.resource(
+    "dynamodb",
+    config=Config(
+        tcp_keepalive=True,
+        max_pool_connections=MAX_WORKERS,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    ),
+)
 table = ddb.Table(TABLE_NAME)
 
 
@@ -17,65 +32,59 @@ def now_iso():
 
 def iter_all_totalpoints():
     """
-    Iterate all seasons, then filter SK=TOTALPOINTS.
-    DynamoDB has no global SK index, so this is the correct pattern.
+    Iterate all TOTALPOINTS rows via the entityType GSI (PK = entityType).
+    Only the LEADERBOARD and LEAGUE_LEADERBOARD partitions are read, one after the
+    other, instead of scanning the whole table, and only their keys come back since
+    that is all the update needs.
     """
-    # 1) get distinct seasons
-    seasons = set()
-    scan_kwargs = {
-        "ProjectionExpression": "season",
-        "FilterExpression": "attribute_exists(season)",
-    }
-
-    resp = table.scan(**scan_kwargs)
-    for i in resp.get("Items", []):
-        seasons.add(i["season"])
-
-    while "LastEvaluatedKey" in resp:
-        resp = table.scan(ExclusiveStartKey=resp["LastEvaluatedKey"], **scan_kwargs)
-        for i in resp.get("Items", []):
-            seasons.add(i["season"])
-
-    # 2) query per season using GSI
-    for season in seasons:
+    for entity_type in ENTITY_TYPES:
         last_key = None
         while True:
             q = {
-                "IndexName": GSI_SEASON,
-                "KeyConditionExpression": Key("season").eq(season),
+                "IndexName": GSI_ENTITYTYPE_CREATEDAT,
+                "KeyConditionExpression": Key("entityType").eq(entity_type),
+                "FilterExpression": Attr("SK").eq(SK_TARGET),
+                "ProjectionExpression": "PK, SK",
             }
             if last_key:
                 q["ExclusiveStartKey"] = last_key
 
             res = table.query(**q)
-            for item in res.get("Items", []):
-                if item.get("SK") == SK_TARGET:
-                    yield item
+            yield from res.get("Items", [])
 
             last_key = res.get("LastEvaluatedKey")
             if not last_key:
                 break
 
 
+def update_one(item, ts):
+    table.update_item(
+        Key={
+            "PK": item["PK"],
+            "SK": item["SK"],
+        },
+        UpdateExpression="SET #category = :c, updatedAt = :u",
+        ExpressionAttributeNames={
+            "#category": "category",
+        },
+        ExpressionAttributeValues={
+            ":c": CATEGORY_VALUE,
+            ":u": ts,
+        },
+    )
+
+
 def main():
     updated = 0
-
-    for item in iter_all_totalpoints():
-        table.update_item(
-            Key={
-                "PK": item["PK"],
-                "SK": item["SK"],
-            },
-            UpdateExpression="SET #category = :c, updatedAt = :u",
-            ExpressionAttributeNames={
-                "#category": "category",
-            },
-            ExpressionAttributeValues={
-                ":c": CATEGORY_VALUE,
-                ":u": now_iso(),
-            },
-        )
-        updated += 1
+    # One timestamp for the whole run
+    ts = now_iso()
+
+    # Each update is independent and bound by its round trip, so overlap them
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = [ex.submit(update_one, item, ts) for item in iter_all_totalpoints()]
+        for future in as_completed(futures):
+            future.result()
+            updated += 1
 
     print(f"TOTALPOINTS updated with category='f1': {updated}")
 
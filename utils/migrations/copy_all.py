@@ -1,7 +1,8 @@
 import os, time, json, boto3
-from itertools import islice
 from boto3.dynamodb.conditions import Key
 
+from _page_query import page_query
+
 TABLE_NAME = os.environ.get("TABLE_NAME", "ApexEntity-5jcwvxujrfbo3hrhevdplmyhsi-NONE")
 
 dynamodb = boto3.resource("dynamodb")
@@ -9,15 +10,6 @@ table = dynamodb.Table(TABLE_NAME)
 
 
 # --- helpers ---
-def chunked(iterable, n=25):
-    it = iter(iterable)
-    while True:
-        batch = list(islice(it, n))
-        if not batch:
-            return
-        yield batch
-
-
 def now_iso():
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
@@ -25,24 +17,15 @@ def now_iso():
 # 1) Build user -> [league_id] map from LEAGUE_MEMBER
 def load_user_leagues():
     leagues_by_user = {}
-    index = "apexEntitiesByUser_idAndCreatedAt"  # PK=user_id
-    # We don't know all users, so scan the index is safest. If you track user_id keys, iterate them instead.
-    resp = table.scan(
+    index = "apexEntitiesByEntityTypeAndCreatedAt"  # PK=entityType
+    # Query only the LEAGUE_MEMBER partition (read cost scales with members, not the
+    # whole index) and fetch just the two attributes used for the map
+    items = page_query(
+        table,
         IndexName=index,
-        FilterExpression="#et = :lm",
-        ExpressionAttributeNames={"#et": "entityType"},
-        ExpressionAttributeValues={":lm": "LEAGUE_MEMBER"},
+        KeyConditionExpression=Key("entityType").eq("LEAGUE_MEMBER"),
+        ProjectionExpression="user_id, league_id",
     )
-    items = resp.get("Items", [])
-    while "LastEvaluatedKey" in resp:
-        resp = table.scan(
-            IndexName=index,
-            FilterExpression="#et = :lm",
-            ExpressionAttributeNames={"#et": "entityType"},
-            ExpressionAttributeValues={":lm": "LEAGUE_MEMBER"},
-            ExclusiveStartKey=resp["LastEvaluatedKey"],
-        )
-        items.extend(resp.get("Items", []))
 
     for it in items:
         uid = it["user_id"]
@@ -54,19 +37,11 @@ def load_user_leagues():
 # 2) Iterate PREDICTION and LEADERBOARD from apexEntitiesByEntityTypeAndCreatedAt
 def load_by_entity_type(entity_type):
     index = "apexEntitiesByEntityTypeAndCreatedAt"  # PK=entityType
-    items = []
-    resp = table.query(
-        IndexName=index, KeyConditionExpression=Key("entityType").eq(entity_type)
+    return page_query(
+        table,
+        IndexName=index,
+        KeyConditionExpression=Key("entityType").eq(entity_type),
     )
-    items.extend(resp.get("Items", []))
-    while "LastEvaluatedKey" in resp:
-        resp = table.query(
-            IndexName=index,
-            KeyConditionExpression=Key("entityType").eq(entity_type),
-            ExclusiveStartKey=resp["LastEvaluatedKey"],
-        )
-        items.extend(resp.get("Items", []))
-    return items
 
 
 def build_league_pk_leaderboard(src, league_id):
@@ -90,66 +65,71 @@ def build_league_pk_prediction(src, league_id):
     return f"prediction#{src['user_id']}#{race_id}#league#{league_id}"
 
 
-def clone_item_for_league(src, league_id, kind):
-    # common fields to carry over
-    clone = dict(src)  # shallow copy
-    clone["league_id"] = league_id
-    clone["createdAt"] = clone.get("createdAt") or now_iso()
-    clone["updatedAt"] = now_iso()
+def prepare_base(src, kind, now):
+    # Everything except the league-specific PK/league_id, built once per source item
+    base = dict(src)  # shallow copy
+    base["createdAt"] = base.get("createdAt") or now
+    base["updatedAt"] = now
 
     if kind == "LEADERBOARD":
         # copy to league-specific leaderboard
-        clone["PK"] = build_league_pk_leaderboard(src, league_id)
-        clone["SK"] = "TOTALPOINTS"  # per schema card
-        clone["entityType"] = (
-            "LEAGUE_LEADERBOARD"  # ✅ new entity type for league scope
-        )
-
-        # Optionally reset or preserve points
-        if "points" in src:
-            clone["points"] = src["points"]
-        else:
-            clone["points"] = 0
+        base["SK"] = "TOTALPOINTS"  # per schema card
+        base["entityType"] = "LEAGUE_LEADERBOARD"  # ✅ new entity type for league scope
+        # Preserve points (0 if missing)
+        base["points"] = src.get("points", 0)
 
     elif kind == "PREDICTION":
-        clone["PK"] = build_league_pk_prediction(src, league_id)
-        clone["SK"] = "RACEPREDICTION"
-        clone["entityType"] = "LEAGUE_PREDICTION"
-        clone["points"] = src.get("points", 0)
+        base["SK"] = "RACEPREDICTION"
+        base["entityType"] = "LEAGUE_PREDICTION"
+        base["points"] = src.get("points", 0)
 
     else:
         raise ValueError("Unsupported kind")
 
+    return base
+
+
+def clone_item_for_league(src, base, league_id, kind):
+    clone = base.copy()
+    clone["league_id"] = league_id
+    if kind == "LEADERBOARD":
+        clone["PK"] = build_league_pk_leaderboard(src, league_id)
+    else:
+        clone["PK"] = build_league_pk_prediction(src, league_id)
     return clone
 
 
+def fan_out(items, leagues_by_user, kind, now):
+    to_write = []
+    for src in items:
+        leagues = leagues_by_user.get(src["user_id"])
+        if not leagues:
+            continue
+        base = prepare_base(src, kind, now)
+        for lid in leagues:
+            to_write.append(clone_item_for_league(src, base, lid, kind))
+    return to_write
+
+
 def write_batches(items):
-    for batch in chunked(items, 25):
-        with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as bw:
-            for it in batch:
-                bw.put_item(Item=it)
+    # batch_writer buffers puts and sends them 25 per BatchWriteItem on its own
+    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as bw:
+        for it in items:
+            bw.put_item(Item=it)
 
 
 def main():
+    # One timestamp for the whole run
+    now = now_iso()
     leagues_by_user = load_user_leagues()
 
     # fanout predictions
     predictions = load_by_entity_type("PREDICTION")
-    to_write = []
-    for p in predictions:
-        u = p["user_id"]
-        for lid in leagues_by_user.get(u, []):
-            to_write.append(clone_item_for_league(p, lid, "PREDICTION"))
-    write_batches(to_write)
+    write_batches(fan_out(predictions, leagues_by_user, "PREDICTION", now))
 
     # fanout leaderboards
     leaderboards = load_by_entity_type("LEADERBOARD")
-    to_write = []
-    for lb in leaderboards:
-        u = lb["user_id"]
-        for lid in leagues_by_user.get(u, []):
-            to_write.append(clone_item_for_league(lb, lid, "LEADERBOARD"))
-    write_batches(to_write)
+    write_batches(fan_out(leaderboards, leagues_by_user, "LEADERBOARD", now))
 
 
 if __name__ == "__main__":
@@ -2,12 +2,23 @@
 import os
 from datetime import datetime, timezone
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
+
+from _batch_get import existing_keys
+from _page_query import page_query
 
 TABLE_NAME = ""
 GSI_BY_SEASON = "apexEntitiesBySeason"  # PK=season (projection ALL)
 
-dynamodb = boto3.resource("dynamodb")
+# Adaptive retries back off on throttling from the batch reads and writes
+dynamodb = boto3.resource(
+    "dynamodb",
+    config=Config(
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    ),
+)
 table = dynamodb.Table(TABLE_NAME)
 
 ISO = "%Y-%m-%dT%H:%M:%S.%fZ"
@@ -16,23 +27,25 @@ now = lambda: datetime.now(timezone.utc).strftime(ISO)
 
 def list_leaderboards_for_season(source_season):
     # Canonical: LEADERBOARD is indexed by season (apexEntitiesBySeason)
-    resp = table.query(
-        IndexName=GSI_BY_SEASON, KeyConditionExpression=Key("season").eq(source_season)
+    # Filter to entityType=LEADERBOARD to avoid DRIVER/RACE/etc that also carry season;
+    # done server-side so the other entities never come back over the wire
+    return page_query(
+        table,
+        IndexName=GSI_BY_SEASON,
+        KeyConditionExpression=Key("season").eq(source_season),
+        FilterExpression=Attr("entityType").eq("LEADERBOARD"),
     )
-    # Filter to entityType=LEADERBOARD to avoid DRIVER/RACE/etc that also carry season
-    return [i for i in resp.get("Items", []) if i.get("entityType") == "LEADERBOARD"]
 
 
-def put_leaderboard_clone(it, target_season, clone_points=False):
+def build_leaderboard_clone(it, target_season, created, clone_points=False):
     # LEADERBOARD keys:
     # PK pattern (example in card): user#{user_id}#season#{season}
     # SK: TOTALPOINTS
     user_id = it["user_id"]
     username = it["username"]
-    created = now()
 
     new_pk = f"user#{user_id}#season#{target_season}"
-    put = {
+    return {
         "PK": new_pk,
         "SK": "TOTALPOINTS",
         "__typename": "ApexEntity",
@@ -46,11 +59,6 @@ def put_leaderboard_clone(it, target_season, clone_points=False):
         "updatedAt": created,
     }
 
-    table.put_item(
-        Item=put,
-        ConditionExpression="attribute_not_exists(PK) AND attribute_not_exists(SK)",
-    )
-
 
 def main():
     source_season = os.getenv("SOURCE_SEASON")  # e.g., "2024"
@@ -64,13 +72,27 @@ def main():
     rows = list_leaderboards_for_season(source_season)
     print(f"Found {len(rows)} LEADERBOARD row(s) in season={source_season}")
 
+    # One timestamp for the whole run
+    created = now()
+
+    # Idempotency: batch_writer can't carry a condition, so look up which target
+    # keys already exist (BatchGetItem, 100 per call) and never write those
+    clones = [
+        build_leaderboard_clone(it, target_season, created, clone_points) for it in rows
+    ]
+    existing = existing_keys(dynamodb, TABLE_NAME, clones)
+
+    # Puts go out 25 per BatchWriteItem. Each queued key joins existing, so a later
+    # source row with the same target key is skipped and the first clone wins.
     copied = 0
-    for it in rows:
-        try:
-            put_leaderboard_clone(it, target_season, clone_points=clone_points)
+    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+        for c in clones:
+            key = (c["PK"], c["SK"])
+            if key in existing:
+                continue
+            batch.put_item(Item=c)
+            existing.add(key)
             copied += 1
-        except table.meta.client.exceptions.ConditionalCheckFailedException:
-            pass
 
     print(f"Copied {copied} → season={target_season} (clone_points={clone_points})")
 
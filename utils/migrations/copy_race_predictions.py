@@ -3,11 +3,22 @@ import os, json
 from datetime import datetime, timezone
 import boto3
 from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+
+from _batch_get import existing_keys
+from _page_query import page_query
 
 TABLE_NAME = ""
 GSI_BY_RACE = "apexEntitiesByRace_id"  # PK=race_id
 
-dynamodb = boto3.resource("dynamodb")
+# Adaptive retries back off on throttling from the batch reads and writes
+dynamodb = boto3.resource(
+    "dynamodb",
+    config=Config(
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    ),
+)
 table = dynamodb.Table(TABLE_NAME)
 
 ISO = "%Y-%m-%dT%H:%M:%S.%fZ"
@@ -17,13 +28,16 @@ now = lambda: datetime.now(timezone.utc).strftime(ISO)
 def list_predictions_for_race(source_race_id):
     # Canonical: query PREDICTIONs by race via GSI
     # (apexEntitiesByRace_id: PK=race_id, PROJECTION=ALL)
-    resp = table.query(
-        IndexName=GSI_BY_RACE, KeyConditionExpression=Key("race_id").eq(source_race_id)
+    return page_query(
+        table,
+        IndexName=GSI_BY_RACE,
+        KeyConditionExpression=Key("race_id").eq(source_race_id),
     )
-    return resp.get("Items", [])
 
 
-def put_prediction_clone(item, target_race_id, target_season=None, reset_points=True):
+def build_prediction_clone(
+    item, target_race_id, created, target_season=None, reset_points=True
+):
     # Required attrs for PREDICTION per card
     # PK pattern: prediction#{user_id}#{race_id}
     # SK: RACEPREDICTION
@@ -37,7 +51,6 @@ def put_prediction_clone(item, target_race_id, target_season=None, reset_points=
         ),
     )
     season = target_season or item.get("season")
-    created = now()
     put = {
         "PK": f"prediction#{user_id}#{target_race_id}",
         "SK": "RACEPREDICTION",
@@ -60,12 +73,7 @@ def put_prediction_clone(item, target_race_id, target_season=None, reset_points=
         put["points"] = 0
     if "points_earned" in item and not reset_points:
         put["points_earned"] = item["points_earned"]
-
-    # Idempotency: don't overwrite if it already exists
-    table.put_item(
-        Item=put,
-        ConditionExpression="attribute_not_exists(PK) AND attribute_not_exists(SK)",
-    )
+    return put
 
 
 def main():
@@ -81,14 +89,28 @@ def main():
     preds = list_predictions_for_race(source_race_id)
     print(f"Found {len(preds)} PREDICTION(s) on race_id={source_race_id}")
 
+    # One timestamp for the whole run
+    created = now()
+
+    # Idempotency: batch_writer can't carry a condition, so look up which target
+    # keys already exist (BatchGetItem, 100 per call) and never write those
+    clones = [
+        build_prediction_clone(it, target_race_id, created, target_season, reset_points)
+        for it in preds
+    ]
+    existing = existing_keys(dynamodb, TABLE_NAME, clones)
+
+    # Puts go out 25 per BatchWriteItem. Each queued key joins existing, so a later
+    # source row with the same target key is skipped and the first clone wins.
     copied = 0
-    for it in preds:
-        try:
-            put_prediction_clone(it, target_race_id, target_season, reset_points)
+    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+        for c in clones:
+            key = (c["PK"], c["SK"])
+            if key in existing:
+                continue
+            batch.put_item(Item=c)
+            existing.add(key)
             copied += 1
-        except table.meta.client.exceptions.ConditionalCheckFailedException:
-            # already exists; skip
-            pass
 
     print(f"Copied {copied} → race_id={target_race_id}")
 
@@ -1,29 +1,35 @@
+# Run from the repo root as a module so the shared helpers resolve:
+#   python -m utils.migrations.leagues.league_names
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import boto3
 from boto3.dynamodb.conditions import Key
-from datetime import datetime, timezone
+from botocore.config import Config
+
+from utils.migrations._page_query import page_query
 
 TABLE_NAME = ""
 GSI_ENTITYTYPE_CREATEDAT = "apexEntitiesByEntityTypeAndCreatedAt"
 
-dynamodb = boto3.resource("dynamodb")
+MAX_WORKERS = 32
+
+# Adaptive retries back off on throttling from the parallel updates
+dynamodb = boto3.resource(
+    "dynamodb",
+    config=Config(
+        tcp_keepalive=True,
+        max_pool_connections=MAX_WORKERS,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    ),
+)
 table = dynamodb.Table(TABLE_NAME)
 
 
-def page_query(**kwargs):
-    """Simple paginator for Query."""
-    items = []
-    resp = table.query(**kwargs)
-    items.extend(resp.get("Items", []))
-    while "LastEvaluatedKey" in resp:
-        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
-        resp = table.query(**kwargs)
-        items.extend(resp.get("Items", []))
-    return items
-
-
 def load_leagues():
     # entityType = LEAGUE on GSI -> ALL projection gives league_id & league_name
     return page_query(
+        table,
         IndexName=GSI_ENTITYTYPE_CREATEDAT,
         KeyConditionExpression=Key("entityType").eq("LEAGUE"),
     )
@@ -32,11 +38,27 @@ def load_leagues():
 def load_league_members():
     # entityType = LEAGUE_MEMBER on GSI -> ALL projection gives PK, SK, league_id, user_id, etc.
     return page_query(
+        table,
         IndexName=GSI_ENTITYTYPE_CREATEDAT,
         KeyConditionExpression=Key("entityType").eq("LEAGUE_MEMBER"),
     )
 
 
+def update_member(pk, sk, lname, now):
+    """Set league_name on one member; returns False if it already had that name."""
+    try:
+        # Guard server-side too, in case the member changed since it was read
+        table.update_item(
+            Key={"PK": pk, "SK": sk},
+            UpdateExpression="SET league_name = :n, updatedAt = :u",
+            ConditionExpression="attribute_not_exists(league_name) OR league_name <> :n",
+            ExpressionAttributeValues={":n": lname, ":u": now},
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
+
+
 def main():
     # 1) Build {league_id: league_name}
     leagues = load_leagues()
@@ -51,32 +73,40 @@ def main():
     members = load_league_members()
     now = datetime.now(timezone.utc).isoformat()
 
-    updated = skipped_no_league = skipped_no_name = 0
-    for m in members:
-        lid = m.get("league_id")
-        if not lid:
-            skipped_no_league += 1
-            continue
-        lname = league_name_by_id.get(lid)
-        if not lname:
-            # league missing or has no league_name
-            skipped_no_name += 1
-            continue
-
-        # Base keys for LEAGUE_MEMBER come from the item itself (projection=ALL includes PK/SK)
-        pk = m["PK"]  # e.g., "league#<league_id>"
-        sk = m["SK"]  # e.g., "member#<user_id>"
-
-        # Write denormalized attribute (NOTE: attribute not defined in cards)
-        table.update_item(
-            Key={"PK": pk, "SK": sk},
-            UpdateExpression="SET league_name = :n, updatedAt = :u",
-            ExpressionAttributeValues={":n": lname, ":u": now},
-        )
-        updated += 1
+    updated = skipped_no_league = skipped_no_name = skipped_unchanged = 0
+    futures = []
+    # Updates are independent, so they run on the pool
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        for m in members:
+            lid = m.get("league_id")
+            if not lid:
+                skipped_no_league += 1
+                continue
+            lname = league_name_by_id.get(lid)
+            if not lname:
+                # league missing or has no league_name
+                skipped_no_name += 1
+                continue
+            if m.get("league_name") == lname:
+                # already backfilled (e.g. a re-run): no write needed
+                skipped_unchanged += 1
+                continue
+
+            # Base keys for LEAGUE_MEMBER come from the item itself (projection=ALL includes PK/SK)
+            pk = m["PK"]  # e.g., "league#<league_id>"
+            sk = m["SK"]  # e.g., "member#<user_id>"
+
+            # Write denormalized attribute (NOTE: attribute not defined in cards)
+            futures.append(ex.submit(update_member, pk, sk, lname, now))
+
+        for future in futures:
+            if future.result():
+                updated += 1
+            else:
+                skipped_unchanged += 1
 
     print(
-        f"Updated: {updated}; skipped (no league_id): {skipped_no_league}; skipped (no league_name in LEAGUE): {skipped_no_name}"
+        f"Updated: {updated}; skipped (no league_id): {skipped_no_league}; skipped (no league_name in LEAGUE): {skipped_no_name}; skipped (unchanged): {skipped_unchanged}"
     )
 
 
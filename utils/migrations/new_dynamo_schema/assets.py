@@ -1,7 +1,10 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
 
 TABLE_NAME = "ApexBackendStack-ApexEntityTableDFB3421A-QK13O45RSY13"
 
@@ -12,7 +15,23 @@ NEW_PK = f"{CATEGORY.lower()}#{SEASON}"  # -> "f1#2026"
 DRY_RUN = False  # True = print only, no writes
 OVERWRITE = False  # False = skip if target already exists
 
-dynamodb = boto3.resource("dynamodb")
+# Parallel Scan segments, each paged by its own thread
+SCAN_SEGMENTS = 8
+
+# RACE/DRIVER rows of the migrated season and category, plus every RACE_RESULT
+SOURCE_FILTER = (
+    (Attr("entityType").eq("RACE") | Attr("entityType").eq("DRIVER"))
+    & (Attr("season").eq(SEASON) & Attr("category").eq(CATEGORY))
+) | Attr("entityType").eq("RACE_RESULT")
+
+# Adaptive retries back off on throttling from the parallel scan and batch writes
+dynamodb = boto3.resource(
+    "dynamodb",
+    config=Config(
+        max_pool_connections=max(10, SCAN_SEGMENTS),
+        retries={"mode": "adaptive", "max_attempts": 10},
+    ),
+)
 table = dynamodb.Table(TABLE_NAME)
 
 
@@ -22,19 +41,25 @@ def slug_from_driver(item: dict) -> str:
     Preferred: driver_id (already stable)
     Fallback: name lowercased without spaces (less safe)
     """
-    if item.get("driver_id"):
+    get = item.get
+    driver_id = get("driver_id")
+    if driver_id:
         # example: "driver_max_verstappen" -> "max_verstappen" or keep full
-        return item["driver_id"].replace("driver_", "")
-    if item.get("name"):
-        return item["name"].lower().replace(" ", "")
+        return driver_id.removeprefix("driver_")
+    name = get("name")
+    if name:
+        return "".join(name.lower().split())
     # fallback to PK suffix
-    pk = item.get("PK", "")
-    return pk.split("#")[-1].replace("driver_", "")
+    return get("PK", "").rpartition("#")[2].removeprefix("driver_")
 
 
-def scan_all(filter_expr):
+def scan_segment(filter_expr, segment, total_segments):
     items = []
-    kwargs = {"FilterExpression": filter_expr}
+    kwargs = {
+        "FilterExpression": filter_expr,
+        "Segment": segment,
+        "TotalSegments": total_segments,
+    }
     while True:
         resp = table.scan(**kwargs)
         items.extend(resp.get("Items", []))
@@ -44,97 +69,129 @@ def scan_all(filter_expr):
     return items
 
 
-def put_item_safe(item: dict):
+def scan_all(filter_expr, total_segments=SCAN_SEGMENTS):
+    # Segments cover disjoint slices of the table, so their pages can be read at once;
+    # each segment's items are yielded as soon as it finishes, in segment order
+    with ThreadPoolExecutor(max_workers=total_segments) as ex:
+        futures = [
+            ex.submit(scan_segment, filter_expr, segment, total_segments)
+            for segment in range(total_segments)
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def load_source_items():
+    """
+    Read the rows for all three migrations in one Scan and split them by entityType.
+    This table has no GSI on entityType or season (only byUser/byCode/byLeaderboard),
+    so a Scan is unavoidable; one pass instead of three reads the table once.
+    The rows are only used to build their migrated copies, so migrate_* rekey them in place.
+    """
+    by_type = {"RACE": [], "DRIVER": [], "RACE_RESULT": []}
+    for it in scan_all(SOURCE_FILTER):
+        by_type[it["entityType"]].append(it)
+    return by_type
+
+
+def existing_target_sks() -> set:
+    """SKs already stored under NEW_PK; every migrated item lands in that one partition."""
+    sks = set()
+    kwargs = {
+        "KeyConditionExpression": Key("PK").eq(NEW_PK),
+        "ProjectionExpression": "SK",
+    }
+    while True:
+        resp = table.query(**kwargs)
+        sks.update(it["SK"] for it in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return sks
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def unique_by_sk(items):
+    """Collapse items that map to the same target SK (all share NEW_PK); the last one wins."""
+    return {it["SK"]: it for it in items}.values()
+
+
+def put_item_safe(item: dict, writer, existing: set) -> bool:
+    """Queue item on the batch writer; returns False if skipped because the target exists."""
+    if not OVERWRITE:
+        # only write if item does NOT exist;
+        # batch writes can't carry a condition, so check the preloaded SKs instead
+        if item["SK"] in existing:
+            return False
+
     if DRY_RUN:
         print("DRY_RUN put:", item["PK"], item["SK"])
-        return
+        return True
 
-    if not OVERWRITE:
-        # only write if item does NOT exist
-        table.put_item(
-            Item=item,
-            ConditionExpression="attribute_not_exists(PK) AND attribute_not_exists(SK)",
-        )
-    else:
-        table.put_item(Item=item)
-
-
-def exists(pk: str, sk: str) -> bool:
-    resp = table.get_item(Key={"PK": pk, "SK": sk})
-    return "Item" in resp
-
-
-def migrate_races():
-    races = scan_all(
-        Attr("entityType").eq("RACE")
-        & Attr("season").eq(SEASON)
-        & Attr("category").eq(CATEGORY)
-    )
+    writer.put_item(Item=item)
+    return True
+
+
+def migrate_races(races, writer, existing):
     print(f"Found races: {len(races)}")
 
+    new_items = []
     for r in races:
         race_id = r.get("race_id") or r.get("PK", "").replace("race#", "")
-        new_item = dict(r)
-        new_item["PK"] = NEW_PK
-        new_item["SK"] = f"race#{race_id}"
-
-        if not OVERWRITE and exists(new_item["PK"], new_item["SK"]):
-            continue
+        r["PK"] = NEW_PK
+        r["SK"] = f"race#{race_id}"
+        new_items.append(r)
 
-        put_item_safe(new_item)
+    for new_item in unique_by_sk(new_items):
+        put_item_safe(new_item, writer, existing)
 
 
-def migrate_drivers():
-    drivers = scan_all(
-        Attr("entityType").eq("DRIVER")
-        & Attr("season").eq(SEASON)
-        & Attr("category").eq(CATEGORY)
-    )
+def migrate_drivers(drivers, writer, existing):
     print(f"Found drivers: {len(drivers)}")
 
+    new_items = []
     for d in drivers:
         driver_slug = slug_from_driver(d)
-        new_item = dict(d)
-        new_item["PK"] = NEW_PK
-        new_item["SK"] = f"drivers#{driver_slug}"
+        d["PK"] = NEW_PK
+        d["SK"] = f"drivers#{driver_slug}"
+        new_items.append(d)
 
-        if not OVERWRITE and exists(new_item["PK"], new_item["SK"]):
-            continue
-
-        put_item_safe(new_item)
+    for new_item in unique_by_sk(new_items):
+        put_item_safe(new_item, writer, existing)
 
 
-def migrate_results():
+def migrate_results(results, writer, existing):
     # Most reliable: scan RACE_RESULT and infer season/category from stored attributes if present.
     # If your RACE_RESULT doesn't have season/category, we still migrate by race_id naming.
-    results = scan_all(Attr("entityType").eq("RACE_RESULT"))
     print(f"Found results total: {len(results)}")
 
-    migrated = 0
+    new_items = []
     for res in results:
         race_id = res.get("race_id") or res.get("PK", "").replace("race#", "")
         # keep only target season (simple contains check; tighten if you store explicit season)
         if SEASON not in race_id:
             continue
 
-        new_item = dict(res)
-        new_item["PK"] = NEW_PK
-        new_item["SK"] = f"results#{race_id}"
+        res["PK"] = NEW_PK
+        res["SK"] = f"results#{race_id}"
+        new_items.append(res)
 
-        if not OVERWRITE and exists(new_item["PK"], new_item["SK"]):
-            continue
-
-        put_item_safe(new_item)
-        migrated += 1
+    migrated = 0
+    for new_item in unique_by_sk(new_items):
+        if put_item_safe(new_item, writer, existing):
+            migrated += 1
 
     print(f"Migrated results: {migrated}")
 
 
 def main():
     print("Migrating to PK:", NEW_PK)
-    migrate_races()
-    migrate_drivers()
-    migrate_results()
+    by_type = load_source_items()
+    existing = set() if OVERWRITE else existing_target_sks()
+
+    # Puts are buffered and sent 25 per BatchWriteItem, unprocessed items retried
+    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as writer:
+        migrate_races(by_type["RACE"], writer, existing)
+        migrate_drivers(by_type["DRIVER"], writer, existing)
+        migrate_results(by_type["RACE_RESULT"], writer, existing)
     print("Done.")
 
 
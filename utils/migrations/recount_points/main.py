@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 import argparse
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# Conditions reused on every query/update
+LEADERBOARD_FILTER = Attr("entityType").eq("LEADERBOARD")
 
-def sum_user_prediction_points(table, user_id: str, season: str) -> tuple[int, int]:
+
+def sum_user_prediction_points(
+    client, table_name: str, user_id: str, season: str
+) -> tuple[int, int]:
     """
     Sum points from all PREDICTION items for a given user and season.
     Returns (total_points, races_count).
@@ -29,26 +36,37 @@ def sum_user_prediction_points(table, user_id: str, season: str) -> tuple[int, i
     races_count = 0
     last_evaluated_key = None
 
+    # This runs once per user, so it goes through a plain low-level client: items stay in
+    # wire format ({"points": {"N": "12"}}) instead of being deserialized attribute by attribute.
+    # table.meta.client would still run boto3's TypeSerializer/TypeDeserializer.
     while True:
         query_kwargs = {
+            "TableName": table_name,
             "IndexName": index_name,
-            "KeyConditionExpression": Key("user_id").eq(user_id),
-            "FilterExpression": Attr("entityType").eq("PREDICTION"),
+            "KeyConditionExpression": "user_id = :user_id",
+            "FilterExpression": "entityType = :entityType",
+            "ExpressionAttributeValues": {
+                ":user_id": {"S": user_id},
+                ":entityType": {"S": "PREDICTION"},
+            },
+            # Only points is summed; the filter still sees the whole item server-side
+            "ProjectionExpression": "points",
         }
         if last_evaluated_key:
             query_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
-        resp = table.query(**query_kwargs)
+        resp = client.query(**query_kwargs)
         # print(resp)
 
-        for item in resp.get("Items", []):
-            # 'points' is optional on PREDICTION; treat missing as 0
-            raw_points = item.get("points", 0)
-            if isinstance(raw_points, Decimal):
-                total_points += int(raw_points)
-            else:
-                total_points += int(raw_points)
-            races_count += 1
+        # 'points' is optional on PREDICTION; treat missing as 0.
+        # Decimal first so a fractional value truncates like before
+        total_points += sum(
+            int(Decimal(item["points"]["N"]))
+            for item in resp.get("Items", [])
+            if "points" in item
+        )
+        # Count is the number of items left after the filter, i.e. the races on this page
+        races_count += resp["Count"]
 
         last_evaluated_key = resp.get("LastEvaluatedKey")
         if not last_evaluated_key:
@@ -58,7 +76,7 @@ def sum_user_prediction_points(table, user_id: str, season: str) -> tuple[int, i
 
 
 def update_leaderboard_total_points(
-    table, user_id: str, season: str, total_points: int, races_count: int
+    table, user_id: str, season: str, total_points: int, races_count: int, now_iso: str
 ):
     """
     Update the LEADERBOARD TOTALPOINTS item for user/season.
@@ -73,15 +91,13 @@ def update_leaderboard_total_points(
     pk = f"user#{user_id}#season#{season}"
     sk = "TOTALPOINTS"
 
-    now_iso = datetime.datetime.utcnow().isoformat() + "Z"
-
     try:
         table.update_item(
             Key={
                 "PK": pk,
                 "SK": sk,
             },
-            ConditionExpression=Attr("entityType").eq("LEADERBOARD"),
+            ConditionExpression=LEADERBOARD_FILTER,
             UpdateExpression="SET points = :points, races = :races, updatedAt = :updatedAt",
             ExpressionAttributeValues={
                 ":points": Decimal(total_points),
@@ -102,7 +118,7 @@ def update_leaderboard_total_points(
 
 def list_leaderboard_users_for_season(table, season: str):
     """
-    Return all LEADERBOARD items for a given season.
+    Yield all LEADERBOARD items for a given season, page by page.
 
     Uses GSI: apexEntitiesBySeason
       - PK: season
@@ -112,27 +128,38 @@ def list_leaderboard_users_for_season(table, season: str):
     Filters to entityType = 'LEADERBOARD'.
     """
     index_name = "apexEntitiesBySeason"
-    items = []
-
     last_evaluated_key = None
 
     while True:
         query_kwargs = {
             "IndexName": index_name,
             "KeyConditionExpression": Key("season").eq(season),
-            "FilterExpression": Attr("entityType").eq("LEADERBOARD"),
+            "FilterExpression": LEADERBOARD_FILTER,
         }
         if last_evaluated_key:
             query_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
         resp = table.query(**query_kwargs)
-        items.extend(resp.get("Items", []))
+        yield from resp.get("Items", [])
 
         last_evaluated_key = resp.get("LastEvaluatedKey")
         if not last_evaluated_key:
             break
 
-    return items
+
+def process_user(table, client, lb, season: str, now_iso: str):
+    """Recompute and store one leaderboard row; users are independent of each other."""
+    user_id = lb["user_id"]
+    total_points, races_count = sum_user_prediction_points(
+        client, table.name, user_id, season
+    )
+    print(
+        f"user_id={user_id} season={season}: computed total prediction points: {total_points}, races: {races_count}"
+    )
+
+    update_leaderboard_total_points(
+        table, user_id, season, total_points, races_count, now_iso
+    )
 
 
 def main():
@@ -141,31 +168,43 @@ def main():
     )
     parser.add_argument("--table-name", required=True, help="DynamoDB table name")
     parser.add_argument("--season", required=True, help="season string, e.g. '2025'")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="users recomputed concurrently (default 16)",
+    )
 
     args = parser.parse_args()
 
-    dynamodb = boto3.resource("dynamodb")
+    # One connection per worker so the threads don't queue for the HTTP pool;
+    # adaptive retries back off on throttling instead of failing a user
+    cfg = Config(
+        max_pool_connections=max(10, args.workers),
+        retries={"mode": "adaptive", "max_attempts": 10},
+    )
+    dynamodb = boto3.resource("dynamodb", config=cfg)
     table = dynamodb.Table(args.table_name)
+    # Plain client for the per-user wire-format queries
+    client = boto3.client("dynamodb", config=cfg)
 
-    # 1) Fetch all LEADERBOARD items for this season
-    leaderboard_items = list_leaderboard_users_for_season(table, args.season)
-    print(f"Found {len(leaderboard_items)} LEADERBOARD items for season {args.season}")
-
-    # 2) For each leaderboard row, recompute and update
-    for lb in leaderboard_items:
-        user_id = lb["user_id"]
-        print(f"\nProcessing user_id={user_id} season={args.season}...")
-
-        total_points, races_count = sum_user_prediction_points(
-            table, user_id, args.season
-        )
-        print(
-            f"  Computed total prediction points: {total_points}, races: {races_count}"
-        )
+    # One updatedAt for the whole run
+    now_iso = (
+        datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+    )
 
-        update_leaderboard_total_points(
-            table, user_id, args.season, total_points, races_count
-        )
+    # 1) Stream all LEADERBOARD items for this season and
+    # 2) recompute and update each one, several users at a time; users are
+    # submitted as their page arrives, so paging overlaps the per-user work
+    with ThreadPoolExecutor(max_workers=args.workers) as ex:
+        futures = [
+            ex.submit(process_user, table, client, lb, args.season, now_iso)
+            for lb in list_leaderboard_users_for_season(table, args.season)
+        ]
+        for future in futures:
+            future.result()
+
+    print(f"Processed {len(futures)} LEADERBOARD items for season {args.season}")
 
 
 if __name__ == "__main__":
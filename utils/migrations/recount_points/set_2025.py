@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 import argparse
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 
 def list_all_leaderboard_totalpoints(table):
     """
-    List all LEADERBOARD TOTALPOINTS rows using GSI apexEntitiesByEntityTypeAndCreatedAt.
+    Yield all LEADERBOARD TOTALPOINTS rows, page by page, using GSI apexEntitiesByEntityTypeAndCreatedAt.
 
     GSI:
       PK = entityType
@@ -17,7 +20,6 @@ def list_all_leaderboard_totalpoints(table):
     """
     index_name = "apexEntitiesByEntityTypeAndCreatedAt"
 
-    items = []
     last_evaluated_key = None
 
     while True:
@@ -31,28 +33,27 @@ def list_all_leaderboard_totalpoints(table):
             query_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
         resp = table.query(**query_kwargs)
-        items.extend(resp.get("Items", []))
+        yield from resp.get("Items", [])
 
         last_evaluated_key = resp.get("LastEvaluatedKey")
         if not last_evaluated_key:
             break
 
-    return items
-
 
-def update_leaderboard_season(table, pk, sk, new_season):
+def update_leaderboard_season(table, pk, sk, new_season, now):
     """
     Update the 'season' attribute on the main-table item (PK, SK).
+    Returns True if the row was written.
     """
-    now = datetime.datetime.utcnow().isoformat() + "Z"
-
     try:
         table.update_item(
             Key={
                 "PK": pk,
                 "SK": sk,
             },
-            ConditionExpression=Attr("entityType").eq("LEADERBOARD"),
+            # Rows already in new_season are left alone, so re-runs don't rewrite them
+            ConditionExpression=Attr("entityType").eq("LEADERBOARD")
+            & Attr("season").ne(new_season),
             UpdateExpression="SET season = :season, updatedAt = :updatedAt",
             ExpressionAttributeValues={
                 ":season": new_season,
@@ -61,8 +62,15 @@ def update_leaderboard_season(table, pk, sk, new_season):
             ReturnValues="UPDATED_NEW",
         )
         print(f"Updated {pk} {sk} -> season={new_season}")
+        return True
     except ClientError as e:
-        print("ERROR:", e)
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            print(
+                f"SKIPPED (not a LEADERBOARD item or already season={new_season}): PK={pk}, SK={sk}"
+            )
+        else:
+            print("ERROR:", e)
+        return False
 
 
 def main():
@@ -71,24 +79,62 @@ def main():
     )
     parser.add_argument("--table-name", required=True)
     parser.add_argument("--season", required=True, help="New season value, e.g. 2025")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=32,
+        help="rows updated concurrently (default 32)",
+    )
 
     args = parser.parse_args()
 
-    dynamodb = boto3.resource("dynamodb")
+    # One session and connection pool shared by every worker: one connection per
+    # worker, kept alive between updates. Short timeouts bound a stuck request
+    # and adaptive retries slow down instead of failing on throttling.
+    session = boto3.session.Session()
+    dynamodb = session.resource(
+        "dynamodb",
+        config=Config(
+            tcp_keepalive=True,
+            connect_timeout=2,
+            read_timeout=10,
+            max_pool_connections=max(10, args.workers),
+            retries={"mode": "adaptive", "max_attempts": 10},
+        ),
+    )
     table = dynamodb.Table(args.table_name)
 
-    # 1) Fetch all leaderboard TOTALPOINTS rows
-    rows = list_all_leaderboard_totalpoints(table)
-    print(f"Found {len(rows)} TOTALPOINTS leaderboard rows")
-
-    # 2) Update each one
-    for item in rows:
-        update_leaderboard_season(
-            table,
-            pk=item["PK"],
-            sk=item["SK"],
-            new_season=args.season,
-        )
+    # One updatedAt for the whole run
+    now = (
+        datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+    )
+
+    # 1) Stream all leaderboard TOTALPOINTS rows and
+    # 2) update each one; UpdateItem can't be batched, so overlap the calls instead.
+    # Rows are submitted as their page arrives, so paging overlaps the updates.
+    skipped_unchanged = 0
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.workers) as ex:
+        for item in list_all_leaderboard_totalpoints(table):
+            if item.get("season") == args.season:
+                # already migrated (e.g. a re-run): no write needed
+                skipped_unchanged += 1
+                continue
+            futures.append(
+                ex.submit(
+                    update_leaderboard_season,
+                    table,
+                    pk=item["PK"],
+                    sk=item["SK"],
+                    new_season=args.season,
+                    now=now,
+                )
+            )
+        updated = sum(future.result() for future in futures)
+
+    print(
+        f"Updated: {updated}; skipped (already season={args.season}): {skipped_unchanged}; not updated: {len(futures) - updated}"
+    )
 
 
 if __name__ == "__main__":